@@ -1,17 +1,19 @@
-from fastapi import Depends, HTTPException, status, BackgroundTasks, APIRouter
+from fastapi import Depends, HTTPException, status, APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.db.session import get_db
+from app.api.deps import invalidate_principal
+from app.core.rate_limit import rate_limit
 from app.models.user import Student, Profile
 from app.models.verification import Verification, PasswordResetOTP
 from app.schema.user import Student_login, Student_Signup
 from app.schema.jwt_and_otp import TokenResponse, VerifyOTP, ResetPassword, ForgotPassword
 from app.core.security import (
-    hash_password, verify_password, create_access_token,
-    generate_otp, hash_otp, otp_expiry, verify_otp, send_email_otp,
+    hash_password_async, verify_and_update_password_async, create_access_token,
+    generate_otp, hash_otp, otp_expiry, verify_otp,
 )
-from app.services.queue_client import send_email
+from app.services.email_outbox import enqueue_email, notify_outbox
 from datetime import datetime
 
 router = APIRouter()
@@ -22,10 +24,13 @@ OTP_SIGNUP_EXPIRY_MINUTES = 2
 OTP_RESET_EXPIRY_MINUTES = 10
 
 
-@router.post("/sign_up", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/sign_up",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("sign_up"))],
+)
 async def sign_up_form(
     student_signup: Student_Signup,
-    background_tsks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Register a new student and send OTP for email verification."""
@@ -71,6 +76,7 @@ async def sign_up_form(
     # Generate OTP and create verification record
     otp = generate_otp()
     otp_hash = hash_otp(otp)
+    hashed_password = await hash_password_async(student_signup.password)
 
     user_st = Verification(
         full_name=student_signup.full_name,
@@ -78,13 +84,18 @@ async def sign_up_form(
         username=student_signup.username,
         mobile_no=student_signup.mobile_no,
         code=otp_hash,
-        hashed_password=hash_password(student_signup.password),
+        hashed_password=hashed_password,
         expires_at=otp_expiry(OTP_SIGNUP_EXPIRY_MINUTES),
         otp_attempts=0,
     )
 
     try:
         db.add(user_st)
+        # Email is committed atomically with the verification row
+        enqueue_email(
+            db, student_signup.email, "otp", {"otp": otp, "minutes": OTP_SIGNUP_EXPIRY_MINUTES},
+            expires_at=user_st.expires_at,
+        )
         await db.commit()
         await db.refresh(user_st)
     except IntegrityError:
@@ -94,12 +105,7 @@ async def sign_up_form(
             detail="Unable to create verification. Please try again.",
         )
 
-    background_tsks.add_task(send_email_otp, student_signup.email, otp)
-    # Also queue via Lambda for reliability
-    try:
-        send_email(student_signup.email, "otp", {"otp": otp})
-    except Exception:
-        pass  # Fallback: background task still sends directly
+    notify_outbox()
     return {"msg": "OTP sent to your email. Verify to complete signup."}
 
 
@@ -185,7 +191,11 @@ async def verify_user_by_email(
     return {"msg": "Verification successful. You can now login"}
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("login"))],
+)
 async def user_login(
     student_log_in: Student_login,
     db: AsyncSession = Depends(get_db),
@@ -202,7 +212,10 @@ async def user_login(
             detail="Invalid credentials",
         )
 
-    if not verify_password(student_log_in.password, user_exist.hashed_password):
+    verified, new_hash = await verify_and_update_password_async(
+        student_log_in.password, user_exist.hashed_password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -214,6 +227,11 @@ async def user_login(
             detail="Please verify your email before logging in",
         )
 
+    # Transparently upgrade hashes made with older argon2 parameters
+    if new_hash:
+        user_exist.hashed_password = new_hash
+        await db.commit()
+
     access_token = create_access_token(data={"sub": str(user_exist.id)})
 
     result = await db.execute(
@@ -229,10 +247,13 @@ async def user_login(
     )
 
 
-@router.post("/forgotpassword", status_code=status.HTTP_200_OK)
+@router.post(
+    "/forgotpassword",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(rate_limit("forgot_password"))],
+)
 async def forgot_password(
     password_reset: ForgotPassword,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Send password reset OTP to user's email."""
@@ -272,14 +293,13 @@ async def forgot_password(
     )
 
     db.add(user_verification)
+    enqueue_email(
+        db, password_reset.email, "otp", {"otp": otp, "minutes": OTP_RESET_EXPIRY_MINUTES},
+        expires_at=user_verification.expires_at,
+    )
     await db.commit()
 
-    background_tasks.add_task(send_email_otp, password_reset.email, otp)
-    # Also queue via Lambda for reliability
-    try:
-        send_email(password_reset.email, "otp", {"otp": otp})
-    except Exception:
-        pass
+    notify_outbox()
     return {"msg": "OTP sent to your email"}
 
 
@@ -340,8 +360,9 @@ async def reset_password(
             detail="User not found",
         )
 
-    user.hashed_password = hash_password(data.new_password)
+    user.hashed_password = await hash_password_async(data.new_password)
     await db.delete(verification)
     await db.commit()
+    invalidate_principal(user.id)
 
     return {"msg": "Password reset successful"}
@@ -1,20 +1,34 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException, status
 from ..db.session import get_db
-from ..core.security import token_decode
+from ..core.config import settings
+from ..core.cache import TTLCache
+from ..core.security import token_decode_cached
 from ..models.user import Student
+from ..schema.user import Principal
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from uuid import UUID
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Keyed by the token "sub" (student id as string)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id):
+    """Drop the cached snapshot after the student's row has changed."""
+    principal_cache.invalidate(str(user_id))
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-):
-    payload = token_decode(token)
+) -> Principal:
+    payload = token_decode_cached(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,6 +41,10 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
+    principal = principal_cache.get(user_id)
+    if principal:
+        return principal
+
     result = await db.execute(
         select(Student).filter(Student.id == UUID(user_id))
     )
@@ -37,4 +55,7 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
+
+    principal = Principal.model_validate(user)
+    principal_cache.set(user_id, principal)
+    return principal
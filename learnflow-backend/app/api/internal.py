@@ -0,0 +1,48 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Optional
+from app.core.config import settings
+from app.db.session import async_engine, replica_engine
+from app.db.replica import routing_stats
+from app.db.pool import pool_stats
+from app.services.mailer import get_smtp_pool
+from app.services.storage import get_signed_url_cache
+from app.services.storage_client import get_storage_client
+
+router = APIRouter()
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Hide /internal/* unless INTERNAL_API_TOKEN is set and presented."""
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected or not x_internal_token or not secrets.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.get("/internal/db-pool", dependencies=[Depends(require_internal_token)])
+async def get_db_pool_stats():
+    """Checked-out/overflow connections and checkout wait times for this worker's pools."""
+    stats = {"primary": pool_stats(async_engine)}
+    if replica_engine is not None:
+        stats["replica"] = pool_stats(replica_engine)
+    stats["read_routing"] = dict(routing_stats)
+    return stats
+
+
+@router.get("/internal/smtp-pool", dependencies=[Depends(require_internal_token)])
+async def get_smtp_pool_stats():
+    """Sends, reconnects and delivery latency of this worker's SMTP pool."""
+    return get_smtp_pool().stats()
+
+
+@router.get("/internal/signed-url-cache", dependencies=[Depends(require_internal_token)])
+async def get_signed_url_cache_stats():
+    """Hit rate of this worker's signed-URL cache (shared counters are not aggregated)."""
+    cache = get_signed_url_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@router.get("/internal/storage-client", dependencies=[Depends(require_internal_token)])
+async def get_storage_client_stats():
+    """Connection reuse, retries and latency of this worker's storage client."""
+    return get_storage_client().stats()
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, func
+from typing import List, Optional, Union
 from app.api.deps import get_current_user
 from app.db.session import get_db
-from app.models.user import Student
+from app.db.replica import get_read_db
+from app.db.query_stats import query_budget
+from app.api.pagination import PageParams, keyset_query, keyset_page
+from app.api.etag import make_etag, etag_matches, not_modified, set_etag
+from app.schema.user import Principal
 from app.models.note import Note
-from app.schema.note import NoteResponse
+from app.schema.note import NoteResponse, NoteUploadURLRequest, NoteUploadURLResponse, NoteConfirm
+from app.schema.pagination import Page
 from app.services.queue_client import trigger_note_summarization
+from app.services.storage import UploadTooLarge, hash_upload
+from app.services.note_blobs import acquire_note_blob, release_note_file
+from app.services.storage_client import get_storage_client
+from app.core.config import settings
+import httpx
 import os
+import re
+import time
 import uuid
-import httpx
 
 router = APIRouter()
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+SIGNED_URL_EXPIRES_SECONDS = 3600
 
 ALLOWED_EXTENSIONS = {
     ".pdf": "pdf",
@@ -27,8 +39,17 @@ ALLOWED_EXTENSIONS = {
     ".png": "image",
 }
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+# Content-Type a direct upload must be stored with, per extension
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
 
 
 @router.post("/upload", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
@@ -36,7 +57,7 @@ async def upload_note(
     title: str = Form(...),
     description: str = Form(None),
     file: UploadFile = File(...),
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     # Validate file extension
@@ -49,42 +70,42 @@ async def upload_note(
 
     file_type = ALLOWED_EXTENSIONS[ext]
 
-    # Read file contents asynchronously
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
+    # Hash the spooled upload (enforcing the size limit as it is read); identical
+    # files are stored once and shared, see app.services.note_blobs
+    try:
+        content_hash = await hash_upload(file, MAX_FILE_SIZE)
+        file_path = await acquire_note_blob(db, file, content_hash, ext, MAX_FILE_SIZE)
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File size must be less than 10MB",
         )
+    if not file_path:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload file",
+        )
 
-    # Generate unique filename
-    file_path = f"notes/{current_user.id}/{uuid.uuid4()}{ext}"
+    return await _save_note(db, current_user, title, description, file_path, file_type, content_hash)
 
-    # Upload to Supabase Storage asynchronously via httpx
-    async with httpx.AsyncClient() as client:
-        upload_url = f"{SUPABASE_URL}/storage/v1/object/Notes/{file_path}"
-        resp = await client.post(
-            upload_url,
-            headers={
-                "Authorization": f"Bearer {SUPABASE_KEY}",
-                "Content-Type": file.content_type,
-                "x-upsert": "false",
-            },
-            content=contents,
-        )
-        if resp.status_code not in (200, 201):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to upload file",
-            )
 
-    # Create Note record
+async def _save_note(
+    db: AsyncSession,
+    current_user: Principal,
+    title,
+    description,
+    file_path: str,
+    file_type: str,
+    content_hash: Optional[str] = None,
+):
+    """Create the Note row for an uploaded file and queue its summary."""
     new_note = Note(
         student_id=current_user.id,
         title=title,
         description=description,
         file_url=file_path,
         file_type=file_type,
+        content_hash=content_hash,
     )
 
     try:
@@ -105,6 +126,7 @@ async def upload_note(
             student_id=str(current_user.id),
             file_url=file_path,
             action="summary",
+            content_hash=content_hash,
         )
     except Exception:
         pass  # Non-critical — note is saved, summarization can be retried
@@ -112,47 +134,146 @@ async def upload_note(
     return new_note
 
 
-@router.get("/", response_model=List[NoteResponse])
-async def get_notes(
-    current_user: Student = Depends(get_current_user),
+# --- Direct uploads: the client PUTs the file to storage, the API only handles metadata ---
+
+@router.post("/upload-url", response_model=NoteUploadURLResponse)
+async def create_note_upload_url(
+    data: NoteUploadURLRequest,
+    current_user: Principal = Depends(get_current_user),
+):
+    """Step 1: get a signed URL to upload the file to, at a path chosen by the server."""
+    _, ext = os.path.splitext(data.filename.lower())
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS.keys())}",
+        )
+    if data.size is not None and data.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File size must be less than 10MB",
+        )
+
+    file_path = f"notes/{current_user.id}/{uuid.uuid4()}{ext}"
+    upload_url = await get_storage_client().create_upload_url("Notes", file_path)
+    if not upload_url:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create upload URL",
+        )
+
+    return NoteUploadURLResponse(
+        upload_url=upload_url,
+        path=file_path,
+        content_type=CONTENT_TYPES[ext],
+        max_size=MAX_FILE_SIZE,
+    )
+
+
+@router.post("/confirm", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
+async def confirm_note_upload(
+    data: NoteConfirm,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Step 2: check the uploaded object, then create the note and queue its summary."""
+    # Only paths handed out by /upload-url for this student
+    match = re.fullmatch(rf"notes/{current_user.id}/[0-9a-f-]{{36}}(\.[a-z]+)", data.path)
+    if not match or match.group(1) not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload path")
+    ext = match.group(1)
+
+    # Check the object before touching the database, so no connection or lock
+    # is held while waiting on storage (a principal cache miss may already have
+    # checked one out; hand it back). Upload URLs don't allow overwriting, so
+    # an object that passes here can't change before the note is saved.
+    await db.close()
+    storage = get_storage_client()
+    try:
+        info = await storage.object_info("Notes", data.path)
+    except httpx.HTTPError as e:
+        print(f"Checking upload {data.path} failed: {e}")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Storage unavailable")
+    if info is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload not found")
+
+    size, content_type = info
+    if size > MAX_FILE_SIZE or content_type != CONTENT_TYPES[ext]:
+        # Don't keep objects we won't reference
+        await storage.delete("Notes", [data.path])
+        detail = "File size must be less than 10MB" if size > MAX_FILE_SIZE else "File content type does not match its extension"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+    # Serialize confirms of the same path until this transaction ends, so two
+    # concurrent requests can't both pass the check below and insert twice.
+    # (file_url can't be unique: deduplicated notes share their blob's path.)
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(data.path))))
+    result = await db.execute(
+        select(Note.id).filter(Note.student_id == current_user.id, Note.file_url == data.path)
+    )
+    if result.first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload already confirmed")
+
+    return await _save_note(db, current_user, data.title, data.description, data.path, ALLOWED_EXTENSIONS[ext])
+
+
+@router.get(
+    "/",
+    response_model=Union[List[NoteResponse], Page[NoteResponse]],
+    dependencies=[Depends(query_budget(3))],
+)
+async def get_notes(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Notes are never edited, so count + newest created_at changes on every upload.
+    # The time bucket rotates the ETag every half URL lifetime, and the URLs in
+    # a 200 stay valid for longer than that, so a client revalidating with 304
+    # never holds expired URLs.
     result = await db.execute(
-        select(Note)
-        .filter(Note.student_id == current_user.id)
-        .order_by(Note.created_at.desc())
+        select(func.count(), func.max(Note.created_at)).filter(Note.student_id == current_user.id)
+    )
+    url_bucket = int(time.time() // (SIGNED_URL_EXPIRES_SECONDS // 2))
+    etag = make_etag("notes", current_user.id, *result.one(), url_bucket, str(request.query_params))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    query = select(Note).filter(Note.student_id == current_user.id)
+    if page.enabled:
+        result = await db.execute(keyset_query(query, Note, page))
+        notes_page = keyset_page(result.scalars().all(), page)
+        notes = notes_page["items"]
+    else:
+        result = await db.execute(query.order_by(Note.created_at.desc()))
+        notes = result.scalars().all()
+
+    # Sign every file in a few batched requests instead of one request per note.
+    # Cached URLs are reused only while they outlive the ETag's time bucket (see above).
+    signed = await get_storage_client().sign_many(
+        "Notes",
+        [note.file_url for note in notes],
+        SIGNED_URL_EXPIRES_SECONDS,
+        min_valid=SIGNED_URL_EXPIRES_SECONDS // 2 + settings.SIGNED_URL_CACHE_MARGIN_SECONDS,
     )
-    notes = result.scalars().all()
-
-    # Generate signed URLs concurrently for all notes
-    response_notes = []
-    async with httpx.AsyncClient() as client:
-        for note in notes:
-            try:
-                sign_url = f"{SUPABASE_URL}/storage/v1/object/sign/Notes/{note.file_url}"
-                resp = await client.post(
-                    sign_url,
-                    headers={"Authorization": f"Bearer {SUPABASE_KEY}"},
-                    json={"expiresIn": 3600},
-                )
-                if resp.status_code == 200:
-                    url = f"{SUPABASE_URL}/storage/v1{resp.json()['signedURL']}"
-                else:
-                    url = note.file_url
-            except Exception:
-                url = note.file_url
-
-            response_notes.append(
-                NoteResponse(
-                    id=note.id,
-                    title=note.title,
-                    description=note.description,
-                    file_url=url,
-                    file_type=note.file_type,
-                    created_at=note.created_at,
-                )
-            )
 
+    response_notes = [
+        NoteResponse(
+            id=note.id,
+            title=note.title,
+            description=note.description,
+            file_url=signed.get(note.file_url) or note.file_url,
+            file_type=note.file_type,
+            created_at=note.created_at,
+        )
+        for note in notes
+    ]
+
+    if page.enabled:
+        return {"items": response_notes, "next_cursor": notes_page["next_cursor"]}
     return response_notes
 
 
@@ -160,7 +281,7 @@ async def get_notes(
 async def request_note_summarization(
     note_id: str,
     action: str = Query("summary", description="summary|flashcards|mcqs|keypoints"),
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Request AI processing for a note (summary, flashcards, MCQs, key points)."""
@@ -180,6 +301,31 @@ async def request_note_summarization(
         student_id=str(current_user.id),
         file_url=note.file_url,
         action=action,
+        content_hash=note.content_hash,
     )
 
     return {"msg": f"{action} generation started", "note_id": note_id}
+
+
+@router.delete("/{note_id}", status_code=status.HTTP_200_OK)
+async def delete_note(
+    note_id: str,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(Note).filter(Note.id == note_id, Note.student_id == current_user.id)
+    )
+    note = result.scalars().first()
+
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    # Shared files are only removed from storage with their last note
+    if not await release_note_file(db, note.file_url):
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to delete note file")
+
+    await db.delete(note)
+    await db.commit()
+    return {"msg": "Note deleted successfully"}
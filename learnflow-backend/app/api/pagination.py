@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+List routes keep returning a plain list unless the client passes `limit` or
+`cursor`; then they return a Page. The cursor is an opaque token encoding the
+last row's (created_at, id), so each page is an index range scan no matter
+how deep the client has paged.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, Query, status
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 100
+
+
+class PageParams:
+    """Query parameters shared by paginated list routes."""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size; enables pagination"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ):
+        self.enabled = limit is not None or cursor is not None
+        self.limit = limit or DEFAULT_PAGE_LIMIT
+        self.after = decode_cursor(cursor) if cursor else None
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_query(query, model, page: PageParams):
+    """Order newest first and fetch one extra row to learn whether another page exists."""
+    if page.after is not None:
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(*page.after))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(page.limit + 1)
+
+
+def keyset_page(rows, page: PageParams) -> dict:
+    items = rows[:page.limit]
+    next_cursor = None
+    if len(rows) > page.limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,46 +1,71 @@
 from datetime import datetime
-from fastapi import Depends, HTTPException, status, APIRouter, UploadFile, File, BackgroundTasks
+from fastapi import Depends, HTTPException, status, APIRouter, UploadFile, File, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.models.verification import EmailChangeRequest
 from app.models.user import Profile, EducationalDetail, Student
+from app.schema.user import Principal
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.schema.profile import ProfileOutput, ProfileCreate, ProfileUpdateRequest, EmailUpdate
+from app.db.query_stats import query_budget
+from app.api.deps import get_current_user, invalidate_principal
+from app.api.etag import make_etag, etag_matches, not_modified, set_etag
+from app.core.rate_limit import rate_limit
+from app.schema.profile import (
+    ProfileOutput, ProfileCreate, ProfileUpdateRequest, EmailUpdate,
+    PhotoUploadURLRequest, PhotoUploadURLResponse, PhotoConfirm,
+)
 from app.schema.jwt_and_otp import VerifyOTP
-from app.core.security import generate_otp, hash_otp, otp_expiry, verify_otp, send_email_otp
-from app.services.queue_client import send_email
-import os
+from app.core.security import generate_otp, hash_otp, otp_expiry, verify_otp
+from app.services.email_outbox import enqueue_email, notify_outbox
+from app.services.storage import invalidate_signed_url, UploadTooLarge
+from app.services.storage_client import get_storage_client
 import httpx
+import os
+import re
+import uuid
 
 router = APIRouter()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-
-@router.get("/profile", response_model=ProfileOutput)
+@router.get(
+    "/profile",
+    response_model=ProfileOutput,
+    dependencies=[Depends(query_budget(2))],
+)
 async def get_profile(
-    current_user: Student = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Retrieve the current user's profile and educational details."""
     result = await db.execute(
-        select(Profile).filter(Profile.student_id == current_user.id)
+        select(Profile, EducationalDetail)
+        .outerjoin(EducationalDetail, EducationalDetail.student_id == Profile.student_id)
+        .filter(Profile.student_id == current_user.id)
     )
-    profile = result.scalars().first()
+    row = result.first()
 
-    if not profile:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found. Please create your profile first",
         )
-
-    result = await db.execute(
-        select(EducationalDetail).filter(EducationalDetail.student_id == current_user.id)
+    profile, education = row
+
+    etag = make_etag(
+        "profile",
+        current_user.id,
+        current_user.full_name,
+        current_user.username,
+        current_user.email,
+        profile.updated_at,
+        education.updated_at if education else None,
     )
-    education = result.scalars().first()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
     return ProfileOutput(
         full_name=current_user.full_name,
@@ -65,7 +90,7 @@ async def get_profile(
 @router.post("/profile_create", status_code=status.HTTP_201_CREATED)
 async def post_profile(
     data: ProfileCreate,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new profile and educational details for the current user."""
@@ -122,7 +147,7 @@ async def post_profile(
 @router.patch("/profile_update", status_code=status.HTTP_200_OK)
 async def update_profile(
     data: ProfileUpdateRequest,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Update the current user's profile and/or educational details."""
@@ -154,8 +179,6 @@ async def update_profile(
             profile.state = data.profile.state
         if data.profile.country is not None:
             profile.country = data.profile.country
-        if data.profile.profile_photo_url is not None:
-            profile.profile_photo_url = data.profile.profile_photo_url
 
     if data.education:
         result = await db.execute(
@@ -202,20 +225,30 @@ async def update_profile(
             detail="Profile update failed. Please try again",
         )
 
+    invalidate_principal(current_user.id)
     return {"msg": "Profile updated successfully"}
 
 
-# --- Profile Photo Endpoints (async Supabase Storage via httpx) ---
+# --- Profile Photo Endpoints (Supabase Storage via the shared StorageClient) ---
 
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5 MB
 ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png"}
 ALLOWED_PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png"}
 
 
+def _owns_photo_path(student_id, path: str) -> bool:
+    """True for the paths the photo endpoints hand out to this student.
+
+    Rows written before the server chose photo paths may hold anything, and
+    storage is called with the service-role key, so never delete other paths.
+    """
+    return path == f"avatars/{student_id}.jpg" or path.startswith(f"avatars/{student_id}/")
+
+
 @router.post("/profile/photo", status_code=status.HTTP_200_OK)
 async def upload_profile_photo(
     file: UploadFile = File(...),
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     if file.content_type not in ALLOWED_CONTENT_TYPES:
@@ -225,8 +258,7 @@ async def upload_profile_photo(
     if ext not in ALLOWED_PHOTO_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Invalid image file extension")
 
-    contents = await file.read()
-    if len(contents) > MAX_IMAGE_SIZE:
+    if file.size is not None and file.size > MAX_IMAGE_SIZE:
         raise HTTPException(status_code=400, detail="Image size must be less than 5MB")
 
     result = await db.execute(
@@ -238,28 +270,106 @@ async def upload_profile_photo(
 
     file_path = f"avatars/{current_user.id}.jpg"
 
-    async with httpx.AsyncClient() as client:
-        upload_url = f"{SUPABASE_URL}/storage/v1/object/Profiles/{file_path}"
-        resp = await client.post(
-            upload_url,
-            headers={
-                "Authorization": f"Bearer {SUPABASE_KEY}",
-                "Content-Type": file.content_type,
-                "x-upsert": "true",
-            },
-            content=contents,
-        )
-        if resp.status_code not in (200, 201):
-            raise HTTPException(status_code=500, detail="Failed to upload profile photo")
+    try:
+        uploaded = await get_storage_client().upload("Profiles", file_path, file, MAX_IMAGE_SIZE, upsert=True)
+    except UploadTooLarge:
+        raise HTTPException(status_code=400, detail="Image size must be less than 5MB")
+    if not uploaded:
+        raise HTTPException(status_code=500, detail="Failed to upload profile photo")
 
+    # Same path is overwritten (x-upsert), so drop the URL signed for the old image
+    await invalidate_signed_url("Profiles", file_path)
+
+    previous = profile.profile_photo_url
     profile.profile_photo_url = file_path
     await db.commit()
+
+    # A photo from the direct-upload flow lives at its own path and is no longer referenced
+    if previous and previous != file_path and _owns_photo_path(current_user.id, previous):
+        try:
+            await get_storage_client().delete("Profiles", [previous])
+        except Exception as e:
+            print(f"Deleting previous profile photo failed: {e}")
+        await invalidate_signed_url("Profiles", previous)
+    return {"msg": "Profile photo uploaded successfully"}
+
+
+# Direct uploads: the client PUTs the image to storage, the API only records it.
+# Each upload gets a new path, so a rejected upload never replaces the current photo.
+
+PHOTO_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png"}
+
+
+@router.post("/profile/photo/upload-url", response_model=PhotoUploadURLResponse)
+async def create_profile_photo_upload_url(
+    data: PhotoUploadURLRequest,
+    current_user: Principal = Depends(get_current_user),
+):
+    if data.content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Only JPG and PNG images are allowed")
+    if data.size is not None and data.size > MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=400, detail="Image size must be less than 5MB")
+
+    file_path = f"avatars/{current_user.id}/{uuid.uuid4()}{PHOTO_EXTENSIONS[data.content_type]}"
+    upload_url = await get_storage_client().create_upload_url("Profiles", file_path)
+    if not upload_url:
+        raise HTTPException(status_code=500, detail="Failed to create upload URL")
+
+    return PhotoUploadURLResponse(upload_url=upload_url, path=file_path, max_size=MAX_IMAGE_SIZE)
+
+
+@router.post("/profile/photo/confirm", status_code=status.HTTP_200_OK)
+async def confirm_profile_photo_upload(
+    data: PhotoConfirm,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if not re.fullmatch(rf"avatars/{current_user.id}/[0-9a-f-]{{36}}\.(jpg|png)", data.path):
+        raise HTTPException(status_code=400, detail="Invalid upload path")
+
+    # Check the object before the first query, so no DB connection is held while waiting
+    # on storage (hand back the one a principal cache miss may have checked out)
+    await db.close()
+    storage = get_storage_client()
+    try:
+        info = await storage.object_info("Profiles", data.path)
+    except httpx.HTTPError as e:
+        print(f"Checking upload {data.path} failed: {e}")
+        raise HTTPException(status_code=502, detail="Storage unavailable")
+    if info is None:
+        raise HTTPException(status_code=400, detail="Upload not found")
+
+    size, content_type = info
+    if size > MAX_IMAGE_SIZE or content_type not in ALLOWED_CONTENT_TYPES:
+        await storage.delete("Profiles", [data.path])
+        detail = "Image size must be less than 5MB" if size > MAX_IMAGE_SIZE else "Only JPG and PNG images are allowed"
+        raise HTTPException(status_code=400, detail=detail)
+
+    result = await db.execute(
+        select(Profile).filter(Profile.student_id == current_user.id)
+    )
+    profile = result.scalars().first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found. Create profile first")
+
+    previous = profile.profile_photo_url
+    profile.profile_photo_url = data.path
+    await db.commit()
+
+    # The old image is no longer referenced
+    if previous and previous != data.path and _owns_photo_path(current_user.id, previous):
+        try:
+            await storage.delete("Profiles", [previous])
+        except Exception as e:
+            print(f"Deleting previous profile photo failed: {e}")
+        await invalidate_signed_url("Profiles", previous)
+
     return {"msg": "Profile photo uploaded successfully"}
 
 
 @router.get("/profile/photo", status_code=status.HTTP_200_OK)
 async def get_profile_photo(
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -270,23 +380,15 @@ async def get_profile_photo(
     if not profile or not profile.profile_photo_url:
         raise HTTPException(status_code=404, detail="Profile photo not found")
 
-    async with httpx.AsyncClient() as client:
-        sign_url = f"{SUPABASE_URL}/storage/v1/object/sign/Profiles/{profile.profile_photo_url}"
-        resp = await client.post(
-            sign_url,
-            headers={"Authorization": f"Bearer {SUPABASE_KEY}"},
-            json={"expiresIn": 600},
-        )
-        if resp.status_code != 200:
-            raise HTTPException(status_code=500, detail="Failed to generate signed URL")
-        data = resp.json()
-
-    return {"url": f"{SUPABASE_URL}/storage/v1{data['signedURL']}"}
+    url = await get_storage_client().sign("Profiles", profile.profile_photo_url, 600)
+    if not url:
+        raise HTTPException(status_code=500, detail="Failed to generate signed URL")
+    return {"url": url}
 
 
 @router.delete("/profile/photo", status_code=status.HTTP_200_OK)
 async def delete_profile_photo(
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -297,16 +399,13 @@ async def delete_profile_photo(
     if not profile or not profile.profile_photo_url:
         raise HTTPException(status_code=404, detail="Profile photo not found")
 
-    async with httpx.AsyncClient() as client:
-        delete_url = f"{SUPABASE_URL}/storage/v1/object/Profiles"
-        resp = await client.delete(
-            delete_url,
-            headers={"Authorization": f"Bearer {SUPABASE_KEY}"},
-            json={"prefixes": [profile.profile_photo_url]},
-        )
-        if resp.status_code not in (200, 204):
+    # Only the student's own objects; anything else is just unlinked
+    if _owns_photo_path(current_user.id, profile.profile_photo_url):
+        if not await get_storage_client().delete("Profiles", [profile.profile_photo_url]):
             raise HTTPException(status_code=500, detail="Failed to delete profile photo")
 
+        await invalidate_signed_url("Profiles", profile.profile_photo_url)
+
     profile.profile_photo_url = None
     await db.commit()
     return {"msg": "Profile photo deleted successfully"}
@@ -314,11 +413,14 @@ async def delete_profile_photo(
 
 # --- Email Change Endpoints ---
 
-@router.patch("/profile/email/request", status_code=200)
+@router.patch(
+    "/profile/email/request",
+    status_code=200,
+    dependencies=[Depends(rate_limit("email_change"))],
+)
 async def request_email_change(
     data: EmailUpdate,
-    background_tasks: BackgroundTasks,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     if data.email == current_user.email:
@@ -352,21 +454,17 @@ async def request_email_change(
     )
 
     db.add(req)
+    enqueue_email(db, data.email, "otp", {"otp": otp, "minutes": 5}, expires_at=req.expires_at)
     await db.commit()
 
-    background_tasks.add_task(send_email_otp, data.email, otp)
-    # Also queue via Lambda for reliability
-    try:
-        send_email(data.email, "otp", {"otp": otp})
-    except Exception:
-        pass
+    notify_outbox()
     return {"msg": "OTP sent to new email"}
 
 
 @router.post("/profile/email/verify", status_code=200)
 async def verify_email_change(
     data: VerifyOTP,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -397,13 +495,19 @@ async def verify_email_change(
         await db.commit()
         raise HTTPException(400, "Invalid OTP")
 
+    result = await db.execute(
+        select(Student).filter(Student.id == current_user.id)
+    )
+    user = result.scalars().first()
+
     try:
-        current_user.email = v.new_email
-        current_user.is_verified = True
+        user.email = v.new_email
+        user.is_verified = True
         await db.delete(v)
         await db.commit()
     except Exception:
         await db.rollback()
         raise HTTPException(400, "Email update failed")
 
+    invalidate_principal(current_user.id)
     return {"msg": "Email updated successfully"}
@@ -2,12 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.roadmap import Roadmap
-from app.db.session import get_db
+from app.db.replica import get_read_db
+from app.api.pagination import PageParams, keyset_query, keyset_page
 from app.schema.roadmap import RoadmapResponse
+from app.schema.pagination import Page
 from app.api.deps import get_current_user
-from app.models.user import Student
+from app.schema.user import Principal
 from app.services.queue_client import trigger_roadmap_generation
 from uuid import UUID
+from typing import Union
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -19,14 +22,18 @@ class RoadmapGenerateRequest(BaseModel):
     context: str = ""
 
 
-@router.get("/roadmaps", response_model=list[RoadmapResponse])
-async def get_roadmaps(db: AsyncSession = Depends(get_db)):
+@router.get("/roadmaps", response_model=Union[list[RoadmapResponse], Page[RoadmapResponse]])
+async def get_roadmaps(page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    if page.enabled:
+        result = await db.execute(keyset_query(select(Roadmap), Roadmap, page))
+        return keyset_page(result.scalars().all(), page)
+
     result = await db.execute(select(Roadmap))
     return result.scalars().all()
 
 
 @router.get("/roadmaps/{roadmap_id}", response_model=RoadmapResponse)
-async def get_roadmap_by_id(roadmap_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_roadmap_by_id(roadmap_id: UUID, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(Roadmap).filter(Roadmap.id == roadmap_id)
     )
@@ -42,7 +49,7 @@ async def get_roadmap_by_id(roadmap_id: UUID, db: AsyncSession = Depends(get_db)
 @router.post("/roadmaps/generate", status_code=status.HTTP_202_ACCEPTED)
 async def generate_roadmap(
     data: RoadmapGenerateRequest,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Trigger AI roadmap generation via Lambda. Results are stored async."""
     trigger_roadmap_generation(
@@ -1,21 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
-from datetime import date
+from sqlalchemy import select, func, and_, or_, not_
+from typing import List, Optional, Union
+from datetime import date, timedelta
 from app.api.deps import get_current_user
 from app.db.session import get_db
-from app.models.user import Student
-from app.models.task import Task
-from app.schema.task import TaskCreate, TaskResponse, TaskUpdate
+from app.db.replica import get_read_db
+from app.db.query_stats import query_budget
+from app.api.pagination import PageParams, keyset_query, keyset_page
+from app.api.etag import make_etag, etag_matches, not_modified, set_etag
+from app.schema.user import Principal
+from app.models.task import Task, StudentDailyTaskStats
+from app.schema.task import TaskCreate, TaskResponse, TaskUpdate, TaskBatchRequest, TaskBatchResponse, TaskDayStats
+from app.services.task_batch import apply_task_batch
+from app.services.task_stats import TaskStatsDelta, apply_task_stats
+from app.core.config import settings
+from app.schema.pagination import Page
 
 router = APIRouter()
 
+MAX_STATS_RANGE_DAYS = 366
+
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task: TaskCreate,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     new_task = Task(
@@ -23,18 +33,63 @@ async def create_task(
         **task.dict(),
     )
     db.add(new_task)
+    await db.flush()
+
+    stats = TaskStatsDelta()
+    stats.add_task(new_task)
+    await apply_task_stats(db, stats)
     await db.commit()
     await db.refresh(new_task)
     return new_task
 
 
-@router.get("/", response_model=List[TaskResponse])
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    batch: TaskBatchRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create, update and delete many tasks in one transaction."""
+    if len(batch.operations) > settings.TASK_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.TASK_BATCH_MAX_OPERATIONS} operations per batch",
+        )
+
+    ids = [op.id for op in batch.operations if op.op != "create"]
+    if len(ids) != len(set(ids)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each task id may appear in only one operation per batch",
+        )
+
+    results = await apply_task_batch(db, current_user.id, batch.operations)
+    return {"results": results}
+
+
+@router.get(
+    "/",
+    response_model=Union[List[TaskResponse], Page[TaskResponse]],
+    dependencies=[Depends(query_budget(3))],
+)
 async def get_tasks(
+    request: Request,
+    response: Response,
     task_date: Optional[date] = Query(None, alias="date", description="Filter by planned date"),
     task_status: Optional[str] = Query(None, alias="status", description="Filter by status"),
-    current_user: Student = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    # Any task write changes the count or the newest updated_at
+    result = await db.execute(
+        select(func.count(), func.max(Task.updated_at)).filter(Task.student_id == current_user.id)
+    )
+    etag = make_etag("tasks", current_user.id, *result.one(), str(request.query_params))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     query = select(Task).filter(Task.student_id == current_user.id)
 
     if task_date:
@@ -43,6 +98,10 @@ async def get_tasks(
     if task_status:
         query = query.filter(Task.status == task_status)
 
+    if page.enabled:
+        result = await db.execute(keyset_query(query, Task, page))
+        return keyset_page(result.scalars().all(), page)
+
     query = query.order_by(Task.created_at.desc())
     result = await db.execute(query)
     return result.scalars().all()
@@ -52,79 +111,109 @@ async def get_tasks(
 async def update_task(
     task_id: str,
     task_update: TaskUpdate,
-    current_user: Student = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    # Locked so the stats delta below subtracts exactly what this update replaces
     result = await db.execute(
-        select(Task).filter(Task.id == task_id, Task.student_id == current_user.id)
+        select(Task)
+        .filter(Task.id == task_id, Task.student_id == current_user.id)
+        .with_for_update()
     )
     task = result.scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    stats = TaskStatsDelta()
+    stats.add_task(task, -1)
+
     update_data = task_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(task, key, value)
 
+    stats.add_task(task)
+    await apply_task_stats(db, stats)
     await db.commit()
     await db.refresh(task)
     return task
 
 
-@router.get("/summary")
-async def get_task_summary(
-    current_user: Student = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+@router.get(
+    "/stats",
+    response_model=List[TaskDayStats],
+    dependencies=[Depends(query_budget(2))],
+)
+async def get_task_stats(
+    date_from: Optional[date] = Query(None, alias="from", description="First day (default: 89 days before 'to')"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day (default: today)"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    """Per-day task counts and planned hours; days without tasks are omitted."""
     today = date.today()
+    date_to = date_to or today
+    date_from = date_from or date_to - timedelta(days=89)
+    if date_from > date_to or (date_to - date_from).days >= MAX_STATS_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"'from' must be on or before 'to', at most {MAX_STATS_RANGE_DAYS} days apart",
+        )
 
-    # Auto-update missed tasks
     result = await db.execute(
-        select(Task).filter(
-            Task.student_id == current_user.id,
-            Task.status == "pending",
-            Task.planned_date < today,
+        select(StudentDailyTaskStats)
+        .filter(
+            StudentDailyTaskStats.student_id == current_user.id,
+            StudentDailyTaskStats.day.between(date_from, date_to),
         )
+        .order_by(StudentDailyTaskStats.day)
     )
-    missed_tasks = result.scalars().all()
-
-    for task in missed_tasks:
-        task.status = "missed"
-
-    if missed_tasks:
-        await db.commit()
-
-    # Get counts using func.count for efficiency
-    total_result = await db.execute(
-        select(func.count()).select_from(Task).filter(Task.student_id == current_user.id)
-    )
-    total = total_result.scalar()
 
-    completed_result = await db.execute(
-        select(func.count()).select_from(Task).filter(
-            Task.student_id == current_user.id, Task.status == "completed"
-        )
-    )
-    completed = completed_result.scalar()
+    days = []
+    for row in result.scalars().all():
+        day = TaskDayStats.model_validate(row)
+        if day.day < today:
+            # Same rule as the summary: overdue pending counts as missed until the rollover job runs
+            day.missed += day.pending
+            day.pending = 0
+        days.append(day)
+    return days
+
+
+@router.get(
+    "/summary",
+    dependencies=[Depends(query_budget(2))],
+)
+async def get_task_summary(
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Read-only: the nightly rollover job (task_processor Lambda) marks overdue
+    # tasks missed. Until it has run, overdue pending tasks are counted as missed.
+    overdue = and_(Task.status == "pending", Task.planned_date < date.today())
 
-    pending_result = await db.execute(
-        select(func.count()).select_from(Task).filter(
-            Task.student_id == current_user.id, Task.status == "pending"
-        )
+    result = await db.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(Task.status == "completed").label("completed"),
+            func.count().filter(Task.status == "pending", not_(overdue)).label("pending"),
+            func.count().filter(or_(Task.status == "missed", overdue)).label("missed"),
+        ).filter(Task.student_id == current_user.id)
     )
-    pending = pending_result.scalar()
+    counts = result.one()
 
-    missed_result = await db.execute(
-        select(func.count()).select_from(Task).filter(
-            Task.student_id == current_user.id, Task.status == "missed"
-        )
-    )
-    missed = missed_result.scalar()
+    # The aggregate is as cheap as any version stamp, so the ETag is derived
+    # from the counts themselves; a match only saves the response body
+    etag = make_etag("summary", current_user.id, *counts)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
     return {
-        "total": total,
-        "completed": completed,
-        "pending": pending,
-        "missed": missed,
+        "total": counts.total,
+        "completed": counts.completed,
+        "pending": counts.pending,
+        "missed": counts.missed,
     }
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict # type: ignore
 
 class Settings(BaseSettings):
@@ -12,6 +13,98 @@ class Settings(BaseSettings):
     MAIL_PORT: int
     MAIL_SERVER: str
 
+    # Async engine: "direct", "pgbouncer" (transaction pooling) or "serverless" (no client pool)
+    DB_ENGINE_PROFILE: str = "direct"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_WARMUP: int = 5
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_COMMAND_TIMEOUT: float = 60
+    DB_SCHEMA_CHECK: str = "warn"  # "warn", "fail" or "off": compare alembic_version with the migration head
+
+    # Optional read replica for routes that opt in with get_read_db (same engine profile as the primary)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5  # fall back to the primary when the replica is further behind
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 2  # how long a lag measurement is reused
+    DB_READ_YOUR_WRITES_SECONDS: float = 5  # a client's reads stay on the primary this long after it writes
+
+    # Most operations accepted by POST /api/tasks/batch
+    TASK_BATCH_MAX_OPERATIONS: int = 200
+
+    # Supabase Storage URL signing: paths per multi-sign request, and parallel
+    # single-path requests when the batch endpoint fails
+    STORAGE_SIGN_BATCH_SIZE: int = 100
+    STORAGE_SIGN_CONCURRENCY: int = 8
+
+    # Shared keep-alive HTTP client for Supabase Storage (HTTP/2 needs the h2 package)
+    STORAGE_HTTP2: bool = True
+    STORAGE_MAX_CONNECTIONS: int = 20
+    STORAGE_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    STORAGE_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    STORAGE_CONNECT_TIMEOUT_SECONDS: float = 5
+    STORAGE_TIMEOUT_SECONDS: float = 30
+    STORAGE_POOL_TIMEOUT_SECONDS: float = 5  # waiting for a free connection
+    STORAGE_UPLOAD_TIMEOUT_SECONDS: float = 120
+    STORAGE_RETRIES: int = 2
+
+    # Signed URLs are reused until they have less than the margin left; set a Redis URL to share them across workers
+    SIGNED_URL_CACHE_ENABLED: bool = True
+    SIGNED_URL_CACHE_MAX_ENTRIES: int = 20000
+    SIGNED_URL_CACHE_MARGIN_SECONDS: int = 300
+    SIGNED_URL_CACHE_REDIS_URL: Optional[str] = None
+
+    # Shared secret for /internal/* endpoints (disabled when unset)
+    INTERNAL_API_TOKEN: Optional[str] = None
+
+    # Pooled SMTP sessions for OTP emails
+    SMTP_POOL_SIZE: int = 4
+    SMTP_MAX_MESSAGES_PER_SESSION: int = 100
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60
+    SMTP_TIMEOUT_SECONDS: int = 30
+
+    # Email outbox dispatcher (runs in every app worker unless disabled)
+    EMAIL_OUTBOX_DISPATCHER_ENABLED: bool = True
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_CLAIM_LEASE_SECONDS: int = 150  # claimed rows are retried after this if the worker died
+    EMAIL_OUTBOX_RETENTION_HOURS: int = 24
+
+    # Expired OTP sweeper (0 disables the in-app scheduler, e.g. when the task_processor cron runs it)
+    OTP_SWEEP_INTERVAL_SECONDS: int = 300
+    OTP_SWEEP_BATCH_SIZE: int = 500
+
+    # Per-request SQL instrumentation
+    SQL_SLOW_QUERY_MS: float = 200
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_QUERY_BUDGET_ENFORCE: bool = False  # turn on in tests to fail routes over their budget
+
+    # Password hashing runs in a separate process pool so argon2 never blocks the event loop
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # argon2 cost parameters; tune per host with `python -m app.scripts.calibrate_argon2`
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # Authenticated principal cache (per worker)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Verified JWT cache (per worker), entries expire at the token's exp
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # Rate limiting on credential endpoints; set a Redis URL to share limits across workers
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+
+    # Connect/read timeout for Redis calls; on timeout callers fall back to local state
+    REDIS_TIMEOUT_SECONDS: float = 0.25
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,166 @@
+"""
+Sliding-window rate limiting for credential endpoints.
+
+Each rule keeps two fixed-window counters (current and previous) and weights
+the previous one by how much of it still overlaps the sliding window. That is
+O(1) per check and needs no per-request timestamps.
+
+Backends:
+  - MemoryRateLimitBackend: per worker, always available
+  - RedisRateLimitBackend: shared across workers (RATE_LIMIT_REDIS_URL)
+"""
+
+import math
+import time
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, Request, status
+from .config import settings
+
+
+class RateLimit(NamedTuple):
+    limit: int    # requests allowed...
+    window: int   # ...per this many seconds
+
+
+# scope -> limits by client IP and by target email
+RATE_LIMITS = {
+    "login": {"ip": RateLimit(20, 60), "email": RateLimit(10, 300)},
+    "sign_up": {"ip": RateLimit(10, 600), "email": RateLimit(3, 600)},
+    "forgot_password": {"ip": RateLimit(10, 600), "email": RateLimit(3, 600)},
+    "email_change": {"ip": RateLimit(10, 600), "email": RateLimit(3, 600)},
+}
+
+
+class MemoryRateLimitBackend:
+    """Per-process counters. Stale windows are pruned once the table grows past max_keys."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters = {}  # key -> [window_index, current, previous]
+
+    async def incr(self, key: str, window: int, now: float):
+        index = int(now // window)
+        entry = self._counters.get(key)
+        if entry is None:
+            if len(self._counters) >= self.max_keys:
+                self._prune(now)
+            entry = self._counters[key] = [index, 0, 0]
+        elif entry[0] != index:
+            # Roll forward: the old current window becomes previous only if adjacent
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[0], entry[1] = index, 0
+        entry[1] += 1
+        return entry[1], entry[2]
+
+    def _prune(self, now: float):
+        longest = max(rule.window for rules in RATE_LIMITS.values() for rule in rules.values())
+        oldest = int(now // longest) - 2
+        for key in [k for k, v in self._counters.items() if v[0] < oldest]:
+            del self._counters[key]
+        if len(self._counters) >= self.max_keys:
+            self._counters.clear()
+
+
+class RedisRateLimitBackend:
+    """Counters in Redis so limits hold across workers and hosts."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency, only needed for a shared backend
+
+        # Short timeouts: an unreachable Redis must fail fast so RateLimiter can use its fallback
+        self._redis = redis.from_url(
+            url,
+            socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+        )
+
+    async def incr(self, key: str, window: int, now: float):
+        index = int(now // window)
+        current_key = f"rl:{key}:{index}"
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.incr(current_key)
+        pipe.expire(current_key, window * 2)
+        pipe.get(f"rl:{key}:{index - 1}")
+        current, _, previous = await pipe.execute()
+        return int(current), int(previous or 0)
+
+
+class RateLimiter:
+    def __init__(self, backend, fallback=None):
+        self.backend = backend
+        self.fallback = fallback
+
+    async def check(self, key: str, rule: RateLimit) -> int:
+        """Count a hit; return 0 if allowed, else seconds until retry."""
+        now = time.time()
+        try:
+            current, previous = await self.backend.incr(key, rule.window, now)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            print(f"Rate limit backend failed, using local counters: {e}")
+            current, previous = await self.fallback.incr(key, rule.window, now)
+
+        elapsed = now % rule.window
+        estimated = previous * (1 - elapsed / rule.window) + current
+        if estimated <= rule.limit:
+            return 0
+        return max(1, math.ceil(rule.window - elapsed))
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        if settings.RATE_LIMIT_REDIS_URL:
+            _limiter = RateLimiter(
+                RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL),
+                fallback=MemoryRateLimitBackend(),
+            )
+        else:
+            _limiter = RateLimiter(MemoryRateLimitBackend())
+    return _limiter
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(scope: str):
+    """Dependency that rejects the request with 429 before the handler (or other dependencies) run.
+
+    Use it in the route decorator's `dependencies=[...]` so it is solved first.
+    The target email is read from the already-parsed JSON body.
+    """
+    rules = RATE_LIMITS[scope]
+
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        checks = [(f"{scope}:ip:{client_ip(request)}", rules["ip"])]
+        try:
+            body = await request.json()
+        except Exception:
+            body = None
+        email = body.get("email") if isinstance(body, dict) else None
+        if isinstance(email, str) and email:
+            checks.append((f"{scope}:email:{email.strip().lower()}", rules["email"]))
+
+        limiter = get_rate_limiter()
+        for key, rule in checks:
+            retry_after = await limiter.check(key, rule)
+            if retry_after:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests. Please try again later",
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+    return dependency
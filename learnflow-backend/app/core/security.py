@@ -1,22 +1,111 @@
 import ssl
-from email.message import EmailMessage
-from passlib.context import CryptContext  # type: ignore
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from jose import jwt, JWTError  # type: ignore
 from datetime import datetime, timedelta
 from .config import settings
+from .cache import TTLCache
 import secrets
 import hashlib
-import aiosmtplib
-
-pwd_ctx = CryptContext(schemes=["argon2"], deprecated="auto")
+import time
+
+@lru_cache(maxsize=1)
+def get_pwd_ctx():
+    """Built on first use; hashing normally happens in the pool's worker processes."""
+    from passlib.context import CryptContext  # type: ignore
+
+    # Hashes made with other parameters are rehashed on the next successful login
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
 
 
 def hash_password(password: str) -> str:
-    return pwd_ctx.hash(password)
+    return get_pwd_ctx().hash(password)
 
 
 def verify_password(plain_pass: str, hashed: str) -> bool:
-    return pwd_ctx.verify(plain_pass, hashed)
+    return get_pwd_ctx().verify(plain_pass, hashed)
+
+
+def verify_and_update_password(plain_pass: str, hashed: str):
+    """Return (verified, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+    return get_pwd_ctx().verify_and_update(plain_pass, hashed)
+
+
+# Async password hashing (argon2 runs in a bounded process pool)
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has PASSWORD_HASH_MAX_PENDING jobs queued."""
+
+
+_hash_pool = None
+_hash_pending = 0
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        # spawn, not fork: the parent has a running event loop and DB pool threads
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+
+async def _run_in_hash_pool(fn, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = _get_hash_pool()
+            try:
+                return await loop.run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); the executor is unusable from now on
+                print("Password hashing pool broke, starting a new one")
+                _reset_hash_pool(pool)
+        raise PasswordHasherBusy()
+    finally:
+        _hash_pending -= 1
+
+
+def _reset_hash_pool(pool: ProcessPoolExecutor):
+    global _hash_pool
+    # Concurrent callers share the broken pool; only the first one replaces it
+    if _hash_pool is pool:
+        _hash_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_pass: str, hashed: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_pass, hashed)
+
+
+async def verify_and_update_password_async(plain_pass: str, hashed: str):
+    return await _run_in_hash_pool(verify_and_update_password, plain_pass, hashed)
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
 
 
 def create_access_token(data: dict, expires_minutes: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES):
@@ -35,6 +124,26 @@ def token_decode(token: str):
         return None
 
 
+# Keyed by sha256(token); jwt.decode only runs on the first request per token
+_token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def token_decode_cached(token: str):
+    """Same as token_decode, memoized until the token's exp claim."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = token_decode(token)
+    if payload and payload.get("exp"):
+        _token_cache.set(key, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+
 # OTP utilities
 
 def generate_otp(length=6):
@@ -52,32 +161,3 @@ def otp_expiry(minutes):
 def verify_otp(plain_otp: str, hashed_otp: str) -> bool:
     return hashlib.sha256(plain_otp.encode()).hexdigest() == hashed_otp
 
-
-async def send_email_otp(to_email: str, otp: str):
-    """Send OTP email asynchronously using aiosmtplib."""
-    message = EmailMessage()
-    message["From"] = f"LearnFlow <{settings.MAIL_FROM}>"
-    message["Reply-To"] = settings.MAIL_FROM
-    message["To"] = to_email
-    message["Subject"] = "Your OTP - LearnFlow"
-
-    message.set_content(
-        f"Hi,\n\n"
-        f"Your OTP for LearnFlow is: {otp}\n\n"
-        f"This OTP is valid for 5 minutes.\n\n"
-        f"If you did not request this, please ignore this email.\n\n"
-        f"- LearnFlow Team"
-    )
-
-    try:
-        await aiosmtplib.send(
-            message,
-            hostname=settings.MAIL_SERVER,
-            port=settings.MAIL_PORT,
-            username=settings.MAIL_USERNAME,
-            password=settings.MAIL_PASSWORD,
-            start_tls=True,
-        )
-        print("Email sent successfully")
-    except Exception as e:
-        print(f"Email sending failed: {e}")
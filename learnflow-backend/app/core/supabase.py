@@ -1,10 +1,16 @@
 import os
-from supabase import create_client
+from functools import lru_cache
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("Supabase environment variables not set")
+@lru_cache(maxsize=1)
+def get_supabase():
+    """Build the Supabase client on first use instead of at import time."""
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    if not supabase_url or not supabase_key:
+        raise RuntimeError("Supabase environment variables not set")
+
+    from supabase import create_client
+
+    return create_client(supabase_url, supabase_key)
@@ -0,0 +1,70 @@
+"""Connection pool instrumentation: how long requests wait to check out a connection."""
+
+import asyncio
+import time
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    stats = {"pool": type(pool).__name__}
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return stats
+
+    stats.update(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        max_overflow=pool._max_overflow,
+    )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_ms_avg=round(pool.wait_total / pool.checkouts * 1000, 2) if pool.checkouts else 0.0,
+            wait_ms_max=round(pool.wait_max * 1000, 2),
+        )
+    return stats
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int):
+    """Open `connections` connections up front so the first requests don't pay for TCP/TLS/auth."""
+    if connections <= 0 or not isinstance(engine.sync_engine.pool, AsyncAdaptedQueuePool):
+        return
+
+    async def _open():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Opened concurrently so the pool grows instead of handing the same connection back
+    results = await asyncio.gather(*(_open() for _ in range(connections)), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        print(f"DB pool warm-up: {len(failed)}/{connections} connections failed: {failed[0]}")
@@ -0,0 +1,111 @@
+"""
+Per-request SQL statistics.
+
+`instrument_engine` hooks the cursor events of an async engine; each statement
+is timed and recorded on the QueryStats object of the current request (held in
+a ContextVar, which SQLAlchemy carries into its greenlets). The middleware
+reports the totals as a `Server-Timing` header, logs slow statements and
+repeated statement shapes (likely N+1), and checks optional per-route budgets
+declared with `query_budget`.
+"""
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from ..core.config import settings
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when SQL_QUERY_BUDGET_ENFORCE is on and a route runs more statements than its budget."""
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions with different params compare equal."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+        self.budget = None
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int):
+        return [(shape, n) for shape, n in self.shapes.items() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start) * 1000
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+        if elapsed_ms >= settings.SQL_SLOW_QUERY_MS:
+            print(f"Slow query ({elapsed_ms:.1f} ms): {_WHITESPACE.sub(' ', statement)}")
+
+
+def query_budget(max_queries: int):
+    """Route dependency declaring how many statements the route may issue."""
+
+    def dependency():
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    return dependency
+
+
+async def query_stats_middleware(request: Request, call_next):
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+
+    response.headers["Server-Timing"] = stats.server_timing()
+    route = f"{request.method} {request.url.path}"
+
+    for shape, n in stats.repeated_shapes(settings.SQL_N_PLUS_ONE_THRESHOLD):
+        print(f"Possible N+1 in {route}: {n}x {shape}")
+
+    if stats.budget is not None and stats.count > stats.budget:
+        msg = f"{route} ran {stats.count} queries (budget {stats.budget})"
+        if settings.SQL_QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(msg)
+        print(f"Query budget exceeded: {msg}")
+
+    return response
@@ -0,0 +1,113 @@
+"""
+Read-replica routing.
+
+Routes that only read opt in by depending on `get_read_db` instead of
+`get_db`. A request is served from the replica unless:
+
+  - no replica is configured (DATABASE_REPLICA_URL unset),
+  - the replica is more than DB_REPLICA_MAX_LAG_SECONDS behind, or its lag
+    cannot be measured (checked at most every DB_REPLICA_LAG_CHECK_SECONDS), or
+  - the same client wrote through `get_db` within the last
+    DB_READ_YOUR_WRITES_SECONDS, so it must see its own changes.
+
+A client is identified by its bearer token (hashed), or its IP when
+unauthenticated. Writes are noticed when they are sent, before the commit
+returns: ORM changes on flush, and Core/bulk INSERT, UPDATE and DELETE
+statements (`session.execute(insert(...))`, which never flush) when executed.
+"""
+
+import asyncio
+import hashlib
+import time
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from ..core.cache import TTLCache
+from ..core.config import settings
+from .session import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+
+# 0 when caught up with everything received, else seconds since the last replayed transaction
+_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+_recent_writers = TTLCache(maxsize=100_000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+_lag_lock = asyncio.Lock()
+_lag_seconds = None  # None when the last check failed
+_lag_checked_at = float("-inf")
+
+# Where reads went, for /internal/db-pool
+routing_stats = {"replica": 0, "primary_no_replica": 0, "primary_lagging": 0, "primary_sticky": 0}
+
+
+def client_key(request: Request) -> str:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "t:" + hashlib.sha256(authorization.encode()).hexdigest()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def _mark_writer(session):
+    request = session.info.get("request")
+    if request is not None:
+        _recent_writers.set(client_key(request), True)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_writer_on_flush(session, flush_context):
+    _mark_writer(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_writer_on_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_writer(orm_execute_state.session)
+
+
+async def replica_lag_seconds():
+    """Replication lag, re-measured at most every DB_REPLICA_LAG_CHECK_SECONDS."""
+    global _lag_seconds, _lag_checked_at
+    if time.monotonic() - _lag_checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+        return _lag_seconds
+
+    async with _lag_lock:
+        if time.monotonic() - _lag_checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            return _lag_seconds
+        try:
+            async with replica_engine.connect() as conn:
+                _lag_seconds = float((await conn.execute(_LAG_SQL)).scalar())
+        except Exception as e:
+            print(f"Replica lag check failed, reading from primary: {e}")
+            _lag_seconds = None
+        _lag_checked_at = time.monotonic()
+    return _lag_seconds
+
+
+async def _use_replica(request: Request) -> bool:
+    if replica_engine is None:
+        routing_stats["primary_no_replica"] += 1
+        return False
+    if _recent_writers.get(client_key(request)):
+        routing_stats["primary_sticky"] += 1
+        return False
+    lag = await replica_lag_seconds()
+    if lag is None or lag > settings.DB_REPLICA_MAX_LAG_SECONDS:
+        routing_stats["primary_lagging"] += 1
+        return False
+    routing_stats["replica"] += 1
+    return True
+
+
+async def get_read_db(request: Request):
+    """Session for read-only routes; the replica when it is safe, otherwise the primary."""
+    session_factory = ReplicaSessionLocal if await _use_replica(request) else AsyncSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,47 @@
+"""Startup check that the database has been migrated to the latest Alembic revision."""
+
+import os
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+
+class SchemaNotAtHead(RuntimeError):
+    pass
+
+
+def script_heads() -> set:
+    # Imported lazily: only startup and the migration CLI need alembic
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def check_schema_at_head(engine: AsyncEngine, mode: str = "warn"):
+    """One SELECT against alembic_version; `mode` is "warn", "fail" or "off"."""
+    if mode == "off":
+        return
+
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = set(result.scalars().all())
+    except DBAPIError:
+        current = set()
+
+    heads = script_heads()
+    if current == heads:
+        return
+
+    msg = (
+        f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(heads)}. "
+        f"Run `alembic upgrade head`."
+    )
+    if mode == "fail":
+        raise SchemaNotAtHead(msg)
+    print(f"WARNING: {msg}")
@@ -1,24 +1,61 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from uuid import uuid4
 from ..core.config import settings
+from .pool import InstrumentedAsyncQueuePool
 
-# Convert postgres:// to postgresql+asyncpg:// for async driver
-ASYNC_DATABASE_URL = settings.DATABASE_URL.replace(
-    "postgresql://", "postgresql+asyncpg://"
-).replace(
-    "postgres://", "postgresql+asyncpg://"
-)
+def _async_url(url: str) -> str:
+    # Convert postgres:// to postgresql+asyncpg:// for async driver
+    url = url.replace("postgresql://", "postgresql+asyncpg://").replace("postgres://", "postgresql+asyncpg://")
+
+    # Remove sslmode from query params for asyncpg (uses ssl=True instead)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "").replace("&sslmode=require", "")
+    return url
+
+
+ASYNC_DATABASE_URL = _async_url(settings.DATABASE_URL)
+
+
+def _engine_options(profile: str) -> dict:
+    """Engine/pool options for a DB_ENGINE_PROFILE.
+
+    direct:     long-lived pooled connections straight to Postgres, asyncpg statement cache on
+    pgbouncer:  pooled, but PgBouncer (transaction mode) may hand each transaction a different
+                server connection, so named prepared statements must be unique and uncached
+    serverless: no client-side pool at all (short-lived processes behind a pooler)
+    """
+    connect_args = {
+        "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if profile in ("pgbouncer", "serverless"):
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+
+    if profile == "serverless":
+        return {"poolclass": NullPool, "connect_args": connect_args}
+    if profile not in ("direct", "pgbouncer"):
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE: {profile}")
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
 
-# Remove sslmode from query params for asyncpg (uses ssl=True instead)
-if "sslmode=require" in ASYNC_DATABASE_URL:
-    ASYNC_DATABASE_URL = ASYNC_DATABASE_URL.replace("?sslmode=require", "").replace("&sslmode=require", "")
 
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10,
+    **_engine_options(settings.DB_ENGINE_PROFILE),
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -27,22 +64,27 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read replica, used only through app.db.replica.get_read_db
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        _async_url(settings.DATABASE_REPLICA_URL),
+        **_engine_options(settings.DB_ENGINE_PROFILE),
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
 
-async def get_db():
+async def get_db(request: Request):
     async with AsyncSessionLocal() as session:
+        # Lets the replica router notice this client's writes (read-your-writes)
+        session.info["request"] = request
         try:
             yield session
         finally:
             await session.close()
 
-
-# Keep sync engine for migrations/table creation only
-SYNC_DATABASE_URL = settings.DATABASE_URL
-if not SYNC_DATABASE_URL.startswith("postgresql://"):
-    SYNC_DATABASE_URL = SYNC_DATABASE_URL.replace("postgres://", "postgresql://")
-
-engine = create_engine(
-    SYNC_DATABASE_URL,
-    connect_args={"sslmode": "require"},
-    pool_pre_ping=True,
-)
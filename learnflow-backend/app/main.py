@@ -1,33 +1,76 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.base import Base
-from app.db.session import engine
+from fastapi.responses import JSONResponse
+from app.db.session import async_engine, replica_engine
+from app.db.schema_check import check_schema_at_head
+from app.db.query_stats import instrument_engine, query_stats_middleware
+from app.db.pool import warm_up_pool
+from app.core.security import PasswordHasherBusy, shutdown_hash_pool
+from app.core.config import settings
+from app.services.mailer import close_smtp_pool
+from app.services.storage_client import close_storage_client
+from app.services.email_outbox import run_outbox_dispatcher
+from app.services.otp_sweeper import run_otp_sweeper
 from app.api.auth import router as auth_router
 from app.api.profile import router as profile_router
 from app.api.roadmap import router as roadmap_router
 from app.api.note import router as note_router
 from app.api.task import router as task_router
+from app.api.internal import router as internal_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables using sync engine (for dev only; use Alembic in prod)
-    Base.metadata.create_all(bind=engine)
+    # Startup: schema is managed by Alembic (`alembic upgrade head`); only verify it here
+    await check_schema_at_head(async_engine, settings.DB_SCHEMA_CHECK)
+    await warm_up_pool(async_engine, settings.DB_POOL_WARMUP)
+    if replica_engine is not None:
+        await warm_up_pool(replica_engine, settings.DB_POOL_WARMUP)
+    background = []
+    if settings.EMAIL_OUTBOX_DISPATCHER_ENABLED:
+        background.append(asyncio.create_task(run_outbox_dispatcher()))
+    if settings.OTP_SWEEP_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(run_otp_sweeper()))
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop background loops, the password hashing workers, pooled SMTP sessions,
+    # storage connections and DB connections
+    for task in background:
+        task.cancel()
+    shutdown_hash_pool()
+    await close_smtp_pool()
+    await close_storage_client()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
 
+instrument_engine(async_engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+app.middleware("http")(query_stats_middleware)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy. Please try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 app.include_router(auth_router)
 app.include_router(profile_router)
 app.include_router(roadmap_router)
 app.include_router(note_router, prefix="/api/notes", tags=["notes"])
 app.include_router(task_router, prefix="/api/tasks", tags=["tasks"])
+app.include_router(internal_router, tags=["internal"], include_in_schema=False)
 
 app.add_middleware(
     CORSMiddleware,
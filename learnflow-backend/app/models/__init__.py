@@ -3,6 +3,7 @@
 
 from .user import Student, Profile, EducationalDetail
 from .verification import Verification, PasswordResetOTP, EmailChangeRequest
-from .task import Task
+from .task import Task, StudentDailyTaskStats
 from .roadmap import Roadmap, Step, Topic, UserRoadmap, UserTopicProgress
-from .note import Note
\ No newline at end of file
+from .note import Note, NoteBlob, NoteContentResult
+from .email_outbox import EmailOutbox
\ No newline at end of file
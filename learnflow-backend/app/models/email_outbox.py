@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, DateTime, Integer, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB # type: ignore
+from ..db.base import Base
+from datetime import datetime
+import uuid
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_email = Column(String, nullable=False)
+    template = Column(String, nullable=False) # key in app.services.email_outbox.TEMPLATES
+    params = Column(JSONB, nullable=False, default=dict) # cleared once sent, failed or expired
+
+    # "pending", "sending" (claimed by a dispatcher until next_attempt_at), "sent", "failed", "expired"
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True) # not delivered after this (the OTP is no longer valid)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Dispatcher claim query only ever looks at pending rows and expired claims
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+        # Sweeper purges delivered / given-up rows by age
+        Index(
+            "ix_email_outbox_finished",
+            "created_at",
+            postgresql_where=text("status IN ('sent', 'failed', 'expired')"),
+        ),
+    )
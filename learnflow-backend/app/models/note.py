@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID # type: ignore
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import UUID, JSONB # type: ignore
 from ..db.base import Base
 from datetime import datetime
 import uuid
@@ -15,5 +15,35 @@ class Note(Base):
     
     file_url = Column(String, nullable=False)
     file_type = Column(String, nullable=False) # "pdf", "image", "word", "ppt"
-    
+    content_hash = Column(String(64), nullable=True)  # sha256 hex; set on upload, or by the AI processor
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # get_notes, newest first
+        Index("ix_notes_student_created", "student_id", "created_at"),
+    )
+
+
+class NoteBlob(Base):
+    """A stored file shared by every note with the same content, see app.services.note_blobs."""
+    __tablename__ = "note_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    file_path = Column(String, nullable=False, unique=True)  # notes/blobs/{hash}{ext} in the Notes bucket
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class NoteContentResult(Base):
+    """AI output (summary, flashcards, ...) per content hash, written by the AI processor and
+    reused for every note with the same content instead of calling the LLM again."""
+    __tablename__ = "note_content_results"
+
+    content_hash = Column(String(64), primary_key=True)
+    action_type = Column(String, primary_key=True)
+    result_data = Column(JSONB, nullable=False)
+
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -25,7 +25,7 @@ class Step(Base):
     __tablename__ = "steps"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    roadmap_id = Column(UUID(as_uuid=True), ForeignKey("roadmaps.id", ondelete="CASCADE"))
+    roadmap_id = Column(UUID(as_uuid=True), ForeignKey("roadmaps.id", ondelete="CASCADE"), index=True)
     title = Column(String, nullable=False)
     description = Column(String)
     step_order = Column(Integer)
@@ -37,7 +37,7 @@ class Topic(Base):
     __tablename__ = "topics"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    step_id = Column(UUID(as_uuid=True), ForeignKey("steps.id", ondelete="CASCADE"))
+    step_id = Column(UUID(as_uuid=True), ForeignKey("steps.id", ondelete="CASCADE"), index=True)
     title = Column(String, nullable=False)
     description = Column(String)
     topic_order = Column(Integer)
@@ -49,8 +49,8 @@ class UserRoadmap(Base):
     __tablename__ = "user_roadmaps"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"))
-    roadmap_id = Column(UUID(as_uuid=True), ForeignKey("roadmaps.id", ondelete="CASCADE"))
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), index=True)
+    roadmap_id = Column(UUID(as_uuid=True), ForeignKey("roadmaps.id", ondelete="CASCADE"), index=True)
 
     progress_percentage = Column(Integer, default=0)
     status = Column(String, default="active")
@@ -65,8 +65,8 @@ class UserTopicProgress(Base):
     __tablename__ = "user_topic_progress"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_roadmap_id = Column(UUID(as_uuid=True), ForeignKey("user_roadmaps.id", ondelete="CASCADE"))
-    topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"))
+    user_roadmap_id = Column(UUID(as_uuid=True), ForeignKey("user_roadmaps.id", ondelete="CASCADE"), index=True)
+    topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), index=True)
 
     is_completed = Column(Boolean, default=False)
     started_at = Column(TIMESTAMP(timezone=True), default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Date, Float, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Date, Float, Integer, Enum, Index, text
 from sqlalchemy.dialects.postgresql import UUID # type: ignore
 from ..db.base import Base
 from datetime import datetime
@@ -26,3 +26,30 @@ class Task(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # get_tasks filtered by date (and status), summary counts
+        Index("ix_tasks_student_planned_status", "student_id", "planned_date", "status"),
+        # get_tasks unfiltered, newest first
+        Index("ix_tasks_student_created", "student_id", "created_at"),
+        # Rollover of overdue pending tasks across all students
+        Index(
+            "ix_tasks_pending_planned_date",
+            "planned_date",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+
+class StudentDailyTaskStats(Base):
+    """Per-student, per-planned-day task counts, maintained incrementally by app.services.task_stats."""
+    __tablename__ = "student_daily_task_stats"
+
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    missed = Column(Integer, nullable=False, default=0)
+    planned_hours = Column(Float, nullable=False, default=0)  # sum of estimated_time
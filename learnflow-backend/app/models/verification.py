@@ -7,13 +7,13 @@ from ..db.base import Base
 class Verification(Base):
     __tablename__ = "verifications"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
-    email = Column(String, nullable=True)
+    email = Column(String, nullable=True, index=True)
     full_name = Column(String, nullable=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     mobile_no = Column(String, nullable=True)
     code = Column(String, nullable=False) #otp code
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     otp_attempts = Column(Integer,nullable = False,  default= 0)
 
@@ -24,7 +24,7 @@ class PasswordResetOTP(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, nullable=False, index=True)
     code = Column(String, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     otp_attempts = Column(Integer, default=0)
 
@@ -44,6 +44,6 @@ class EmailChangeRequest(Base):
 
     new_email = Column(String, nullable=False, index=True)
     code = Column(String, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     otp_attempts = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -18,3 +18,16 @@ class NoteResponse(NoteBase):
 
     class Config:
         from_attributes = True
+
+class NoteUploadURLRequest(BaseModel):
+    filename: str
+    size: Optional[int] = None  # checked against the limit up front when given
+
+class NoteUploadURLResponse(BaseModel):
+    upload_url: str     # PUT the file here with the given Content-Type
+    path: str           # send back to /confirm
+    content_type: str
+    max_size: int
+
+class NoteConfirm(NoteBase):
+    path: str
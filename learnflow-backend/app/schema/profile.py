@@ -45,7 +45,6 @@ class ProfileUpdate(BaseModel):
     city: Optional[str] = None
     state: Optional[str] = None
     country: Optional[str] = None
-    profile_photo_url: Optional[str] = None
 
 
 class EducationalDetailsUpdate(BaseModel):
@@ -87,4 +86,19 @@ class ProfileOutput(BaseModel):
     institution_name: Optional[str]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class PhotoUploadURLRequest(BaseModel):
+    content_type: str               # image/jpeg or image/png
+    size: Optional[int] = None      # checked against the limit up front when given
+
+
+class PhotoUploadURLResponse(BaseModel):
+    upload_url: str                 # PUT the image here with the same Content-Type
+    path: str                       # send back to /profile/photo/confirm
+    max_size: int
+
+
+class PhotoConfirm(BaseModel):
+    path: str
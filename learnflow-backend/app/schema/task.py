@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime, date
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
 
 class TaskBase(BaseModel):
     title: str
@@ -34,3 +34,45 @@ class TaskResponse(TaskBase):
 
     class Config:
         from_attributes = True
+
+class TaskBatchCreate(BaseModel):
+    op: Literal["create"]
+    task: TaskCreate
+
+class TaskBatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: UUID
+    changes: TaskUpdate
+
+class TaskBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: UUID
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete],
+    Field(discriminator="op"),
+]
+
+class TaskBatchRequest(BaseModel):
+    operations: List[TaskBatchOperation] = Field(..., min_length=1)
+
+class TaskBatchResult(BaseModel):
+    index: int                      # position in the request's operations list
+    op: str
+    status: str                     # "created", "updated", "deleted" or "not_found"
+    id: Optional[UUID] = None
+    task: Optional[TaskResponse] = None
+
+class TaskBatchResponse(BaseModel):
+    results: List[TaskBatchResult]
+
+class TaskDayStats(BaseModel):
+    day: date
+    total: int
+    completed: int
+    pending: int
+    missed: int
+    planned_hours: float
+
+    class Config:
+        from_attributes = True
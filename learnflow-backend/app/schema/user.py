@@ -1,4 +1,5 @@
 from typing import Optional
+from uuid import UUID
 from pydantic import BaseModel, EmailStr
 
 #user registration pydantic models
@@ -11,3 +12,16 @@ class Student_Signup(BaseModel):
 class Student_login(BaseModel):
     email: str
     password : str
+
+#authenticated user snapshot returned by get_current_user
+class Principal(BaseModel):
+    id: UUID
+    email: str
+    username: str
+    full_name: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+        frozen = True
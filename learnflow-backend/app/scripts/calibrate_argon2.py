@@ -0,0 +1,106 @@
+"""
+Calibrate argon2 cost parameters for this host.
+
+Picks the largest memory cost whose single-pass hash fits the target latency,
+then raises the time cost (passes) as far as the target allows, and writes the
+result to the settings file (.env by default).
+
+Usage:
+    python -m app.scripts.calibrate_argon2 --target-ms 250
+    python -m app.scripts.calibrate_argon2 --target-ms 150 --dry-run
+"""
+
+import argparse
+import os
+import statistics
+import time
+from passlib.hash import argon2  # type: ignore
+
+# KiB, largest first; 19 MiB is the OWASP floor for argon2id
+MEMORY_COSTS = [262144, 131072, 65536, 47104, 19456]
+MAX_TIME_COST = 10
+SAMPLES = 5
+
+
+def measure_ms(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    hasher = argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hasher.hash("calibration-password")  # warm-up
+    timings = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, parallelism: int) -> dict:
+    for memory_cost in MEMORY_COSTS:
+        one_pass = measure_ms(1, memory_cost, parallelism)
+        print(f"  m={memory_cost} KiB t=1: {one_pass:.1f} ms")
+        if one_pass > target_ms:
+            continue
+
+        time_cost = 1
+        latency = one_pass
+        while time_cost < MAX_TIME_COST:
+            candidate = measure_ms(time_cost + 1, memory_cost, parallelism)
+            print(f"  m={memory_cost} KiB t={time_cost + 1}: {candidate:.1f} ms")
+            if candidate > target_ms:
+                break
+            time_cost, latency = time_cost + 1, candidate
+
+        return {
+            "ARGON2_TIME_COST": time_cost,
+            "ARGON2_MEMORY_COST": memory_cost,
+            "ARGON2_PARALLELISM": parallelism,
+            "latency_ms": round(latency, 1),
+        }
+
+    memory_cost = MEMORY_COSTS[-1]
+    return {
+        "ARGON2_TIME_COST": 1,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism,
+        "latency_ms": round(measure_ms(1, memory_cost, parallelism), 1),
+    }
+
+
+def write_env(path: str, values: dict):
+    """Replace or append KEY=value lines, leaving the rest of the file untouched."""
+    lines = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    pending = dict(values)
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in pending:
+            lines[i] = f"{key}={pending.pop(key)}"
+    lines.extend(f"{key}={value}" for key, value in pending.items())
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250, help="target latency per hash")
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--env-file", default=".env")
+    parser.add_argument("--dry-run", action="store_true", help="print the result without writing it")
+    args = parser.parse_args()
+
+    print(f"Calibrating argon2 for {args.target_ms:.0f} ms (parallelism={args.parallelism})")
+    result = calibrate(args.target_ms, args.parallelism)
+    latency = result.pop("latency_ms")
+    print(f"Selected {result} -> {latency} ms per hash")
+
+    if args.dry_run:
+        return
+    write_env(args.env_file, result)
+    print(f"Wrote {args.env_file}; restart the app to apply. Existing hashes upgrade on next login.")
+
+
+if __name__ == "__main__":
+    main()
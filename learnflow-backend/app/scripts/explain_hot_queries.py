@@ -0,0 +1,104 @@
+"""
+Check that the hot queries from app/api can be served by an index.
+
+Each query is EXPLAINed with sequential scans disabled, so the planner only
+falls back to a Seq Scan when no usable index exists; that makes the check
+independent of how much data the database holds. Exits non-zero if any query
+still scans one of its tables sequentially. Run it against a migrated
+database (`alembic upgrade head`).
+
+Usage:
+    python -m app.scripts.explain_hot_queries
+    python -m app.scripts.explain_hot_queries --verbose
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from datetime import date
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from app.db.session import async_engine
+from app.models.note import Note
+from app.models.roadmap import Step, Topic, UserRoadmap, UserTopicProgress
+from app.models.task import Task
+
+STUDENT_ID = uuid.uuid4()
+SOME_IDS = [uuid.uuid4(), uuid.uuid4()]
+TODAY = date.today()
+
+# name -> statement, mirroring the queries issued by the routes
+HOT_QUERIES = {
+    "tasks: list": select(Task)
+        .filter(Task.student_id == STUDENT_ID)
+        .order_by(Task.created_at.desc()),
+    "tasks: list by date and status": select(Task)
+        .filter(Task.student_id == STUDENT_ID, Task.planned_date == TODAY, Task.status == "pending")
+        .order_by(Task.created_at.desc()),
+    "tasks: summary counts": select(func.count())
+        .select_from(Task)
+        .filter(Task.student_id == STUDENT_ID, Task.status == "completed"),
+    "tasks: overdue pending for a student": select(Task)
+        .filter(Task.student_id == STUDENT_ID, Task.status == "pending", Task.planned_date < TODAY),
+    "tasks: overdue pending (rollover)": select(Task.id)
+        .filter(Task.status == "pending", Task.planned_date < TODAY),
+    "notes: list": select(Note)
+        .filter(Note.student_id == STUDENT_ID)
+        .order_by(Note.created_at.desc()),
+    "roadmaps: steps selectin": select(Step).filter(Step.roadmap_id.in_(SOME_IDS)),
+    "roadmaps: topics selectin": select(Topic).filter(Topic.step_id.in_(SOME_IDS)),
+    "roadmaps: by student": select(UserRoadmap).filter(UserRoadmap.student_id == STUDENT_ID),
+    "roadmaps: enrolments of a roadmap": select(UserRoadmap).filter(UserRoadmap.roadmap_id == SOME_IDS[0]),
+    "roadmaps: topic progress": select(UserTopicProgress)
+        .filter(UserTopicProgress.user_roadmap_id.in_(SOME_IDS)),
+    "roadmaps: progress of a topic": select(UserTopicProgress)
+        .filter(UserTopicProgress.topic_id == SOME_IDS[0]),
+}
+
+
+def seq_scans(plan: dict):
+    """Yield the relation names of every Seq Scan node in a JSON plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def explain_all(verbose: bool) -> int:
+    failures = 0
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for name, statement in HOT_QUERIES.items():
+            sql = compile_sql(statement)
+            raw = (await conn.execute(text("EXPLAIN (FORMAT JSON) " + sql))).scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            scanned = sorted(set(seq_scans(plan)))
+            print(f"{'SEQ SCAN' if scanned else 'ok':8}  {name}" + (f"  ({', '.join(scanned)})" if scanned else ""))
+            if verbose:
+                print(json.dumps(plan, indent=2))
+            failures += bool(scanned)
+    await async_engine.dispose()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print each plan")
+    args = parser.parse_args()
+
+    failures = asyncio.run(explain_all(args.verbose))
+    if failures:
+        sys.exit(f"{failures} hot queries have no usable index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure how password hashing affects request latency.
+
+Runs a burst of concurrent logins (argon2 verifies) next to a stream of cheap
+requests, once with argon2 called directly on the event loop (the old
+behaviour) and once through the hashing process pool, and prints p50/p99 for
+both kinds of request. The cheap requests show what every other endpoint
+experiences while logins are being hashed.
+
+Usage:
+    python -m app.scripts.hash_latency
+    python -m app.scripts.hash_latency --logins 64 --concurrency 16
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+from app.core.config import settings
+from app.core.security import hash_password, verify_password, verify_password_async, shutdown_hash_pool
+
+PING_INTERVAL = 0.005
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1000
+    return f"p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   (n={len(samples)})"
+
+
+async def run(verify, hashed: str, logins: int, concurrency: int):
+    login_latencies, ping_latencies = [], []
+    slots = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def login():
+        async with slots:
+            await verify("benchmark-password", hashed)
+            login_latencies.append(time.perf_counter() - arrival)
+
+    async def pinger():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PING_INTERVAL)
+            ping_latencies.append(time.perf_counter() - start - PING_INTERVAL)
+
+    ping_task = asyncio.create_task(pinger())
+    # All logins arrive together; waiting behind other logins counts towards their latency
+    arrival = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    done.set()
+    await ping_task
+    return login_latencies, ping_latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8, help="logins in flight at once")
+    args = parser.parse_args()
+
+    hashed = hash_password("benchmark-password")
+
+    async def inline(plain, hashed):
+        return verify_password(plain, hashed)
+
+    print(f"{args.logins} logins, {args.concurrency} concurrent, {settings.PASSWORD_HASH_WORKERS} pool workers")
+    await verify_password_async("benchmark-password", hashed)  # start the pool workers
+    for name, verify in (("inline", inline), ("pool", verify_password_async)):
+        logins, pings = await run(verify, hashed, args.logins, args.concurrency)
+        print(f"{name:>6}  login: {percentiles(logins)}")
+        print(f"{name:>6}  other: {percentiles(pings)}  (extra delay)")
+    shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
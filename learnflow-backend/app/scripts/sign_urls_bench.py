@@ -0,0 +1,104 @@
+"""
+Compare ways of signing the file URLs of a notes listing.
+
+Signs N paths against a mock storage transport that answers every request
+after a fixed delay, three ways:
+  - sequential: one POST /object/sign/{bucket}/{path} per note (the old get_notes)
+  - batched:    sign_urls with the multi-path endpoint
+  - fallback:   sign_urls when the multi-path endpoint fails, so every chunk
+                is signed path by path, at most STORAGE_SIGN_CONCURRENCY at a time
+and prints the wall time, the number of requests and the most requests that
+were in flight at once. The signed URL cache is bypassed.
+
+Usage:
+    python -m app.scripts.sign_urls_bench
+    python -m app.scripts.sign_urls_bench --paths 500 --latency-ms 50
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+os.environ.setdefault("SUPABASE_URL", "http://storage.invalid")
+
+import argparse
+import asyncio
+import json
+import time
+import httpx
+from app.core.config import settings
+from app.services.storage import sign_url, sign_urls
+
+BUCKET = "Notes"
+EXPIRES_IN = 3600
+
+
+class MockStorage(httpx.AsyncBaseTransport):
+    """Answers signing requests after `latency` seconds; the multi-path endpoint can be made to fail."""
+
+    def __init__(self, latency: float, batch_fails: bool = False):
+        self.latency = latency
+        self.batch_fails = batch_fails
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        prefix = f"/storage/v1/object/sign/{BUCKET}"
+        body = json.loads(await request.aread())
+        if request.url.path == prefix:
+            if self.batch_fails:
+                return httpx.Response(500)
+            return httpx.Response(200, json=[
+                {"path": path, "signedURL": f"/object/sign/{BUCKET}/{path}?token=t"} for path in body["paths"]
+            ])
+        path = request.url.path[len(prefix) + 1:]
+        return httpx.Response(200, json={"signedURL": f"/object/sign/{BUCKET}/{path}?token=t"})
+
+
+async def sequential(client: httpx.AsyncClient, paths: list) -> dict:
+    return {path: await sign_url(client, BUCKET, path, EXPIRES_IN) for path in paths}
+
+
+async def batched(client: httpx.AsyncClient, paths: list) -> dict:
+    # min_valid == expires_in turns the cache off
+    return await sign_urls(client, BUCKET, paths, EXPIRES_IN, min_valid=EXPIRES_IN)
+
+
+async def run(name: str, sign, paths: list, latency: float, batch_fails: bool = False):
+    storage = MockStorage(latency, batch_fails)
+    async with httpx.AsyncClient(transport=storage) as client:
+        start = time.perf_counter()
+        signed = await sign(client, paths)
+        elapsed = (time.perf_counter() - start) * 1000
+    assert all(signed.get(path) for path in paths), f"{name}: some paths were not signed"
+    print(f"{name:>10}: {elapsed:8.0f} ms   {storage.requests:4} requests   max {storage.max_in_flight} in flight")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    paths = [f"notes/bench/{i}.pdf" for i in range(args.paths)]
+    latency = args.latency_ms / 1000
+    print(
+        f"{args.paths} paths, {args.latency_ms:g} ms per request, batches of {settings.STORAGE_SIGN_BATCH_SIZE}, "
+        f"fallback concurrency {settings.STORAGE_SIGN_CONCURRENCY}"
+    )
+    await run("sequential", sequential, paths, latency)
+    await run("batched", batched, paths, latency)
+    await run("fallback", batched, paths, latency, batch_fails=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
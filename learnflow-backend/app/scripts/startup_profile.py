@@ -0,0 +1,94 @@
+"""
+Measure how long the API takes to become ready.
+
+Reports the slowest imports of `app.main` (from `python -X importtime`) and the
+wall time from spawning uvicorn to the first successful request. Exits non-zero
+when the cold start is over budget, so it can gate a deploy.
+
+Usage:
+    python -m app.scripts.startup_profile
+    python -m app.scripts.startup_profile --budget-ms 1500 --top 15
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def import_profile(top: int):
+    """Return [(cumulative_ms, module)] for the slowest imports of app.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import app.main failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, module.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(timeout: float = 30) -> float:
+    """Spawn uvicorn and return ms until GET /openapi.json succeeds."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/openapi.json"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                sys.exit("uvicorn exited before serving a request")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.02)
+        sys.exit(f"no response from {url} after {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10, help="how many imports to list")
+    parser.add_argument("--budget-ms", type=float, default=3000, help="fail if cold start exceeds this")
+    parser.add_argument("--imports-only", action="store_true", help="skip starting the server")
+    args = parser.parse_args()
+
+    print("Slowest imports of app.main (cumulative):")
+    for ms, module in import_profile(args.top):
+        print(f"  {ms:8.1f} ms  {module}")
+
+    if args.imports_only:
+        return
+
+    cold_ms = time_to_first_request()
+    print(f"Cold start to first request: {cold_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if cold_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Time GET /api/tasks/summary for a student with many tasks.
+
+Seeds a throwaway student with N tasks spread over the past and next few
+months (about 45% of them overdue and still pending, which the nightly
+rollover would mark missed), calls the route through the ASGI app, and prints the
+median and p99 latency plus the response. The student and their tasks are
+deleted afterwards. Run it against a migrated database (`alembic upgrade head`).
+
+Usage:
+    python -m app.scripts.task_summary_bench
+    python -m app.scripts.task_summary_bench --tasks 200000 --calls 50
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+import uuid
+import httpx
+from sqlalchemy import text
+from app.core.security import create_access_token
+from app.db.session import async_engine
+from app.main import app
+
+SEED_TASKS = text("""
+    INSERT INTO tasks (id, student_id, title, subject, status, priority, planned_date,
+                       is_carried_forward, created_at, updated_at)
+    SELECT gen_random_uuid(), :student_id, 'Task ' || i, 'Bench',
+           -- 45% overdue pending, 10% upcoming pending, 30% completed, 15% missed
+           CASE WHEN i % 20 < 11 THEN 'pending' WHEN i % 20 < 17 THEN 'completed' ELSE 'missed' END,
+           'medium',
+           CASE WHEN i % 20 < 9 THEN current_date - (1 + i % 90)
+                WHEN i % 20 < 11 THEN current_date + i % 30
+                ELSE current_date + (i % 60 - 30) END,
+           false, now(), now()
+    FROM generate_series(1, :n) AS i
+""")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    student_id = uuid.uuid4()
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO students (id, email, mobile_no, full_name, username, hashed_password,
+                                      is_active, is_verified, created_at)
+                VALUES (:id, :email, '0', 'Benchmark', :username, '-', true, true, now())
+            """),
+            {"id": student_id, "email": f"bench-{student_id}@example.invalid", "username": f"bench-{student_id}"},
+        )
+        await conn.execute(SEED_TASKS, {"student_id": student_id, "n": args.tasks})
+        await conn.execute(text("ANALYZE tasks"))
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(student_id)})}"}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            latencies = []
+            for _ in range(args.calls):
+                start = time.perf_counter()
+                resp = await client.get("/api/tasks/summary", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                resp.raise_for_status()
+    finally:
+        async with async_engine.begin() as conn:
+            await conn.execute(text("DELETE FROM students WHERE id = :id"), {"id": student_id})
+        await async_engine.dispose()
+
+    # The first call also loads the principal and warms the connection pool
+    first = latencies[0] * 1000
+    latencies = sorted(latencies[1:] or latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000
+    print(f"{args.tasks} tasks, {args.calls} calls")
+    print(f"first {first:7.1f} ms   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+    print(f"response: {resp.json()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Measure worker memory per upload: streamed from the spool vs read() into memory.
+
+Sends 10 MB files through StorageClient.upload with the network replaced by a
+sink transport that drains the request body, once with the old behaviour
+(`content=await file.read()`) and once with `stream_upload`, and prints the
+tracemalloc peak for 1 and for N concurrent uploads. The files are spooled the
+way Starlette spools multipart bodies (1 MB in memory, the rest on disk).
+Finally, checks that a stream without a known size stops at the size limit.
+
+Usage:
+    python -m app.scripts.upload_memory_bench
+    python -m app.scripts.upload_memory_bench --size-mb 20 --concurrency 16
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+os.environ.setdefault("SUPABASE_URL", "http://storage.invalid")
+
+import argparse
+import asyncio
+import tempfile
+import tracemalloc
+import httpx
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from app.services.storage import SUPABASE_URL, UploadTooLarge, upload_headers
+from app.services.storage_client import StorageClient
+
+SPOOL_MAX_SIZE = 1024 * 1024  # Starlette's in-memory part of a multipart file
+WRITE_CHUNK = 1024 * 1024
+
+
+class SinkTransport(httpx.AsyncBaseTransport):
+    """Accepts every request and discards its body, counting the bytes."""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async for chunk in request.stream:
+            self.received += len(chunk)
+        return httpx.Response(200, json={"Key": request.url.path})
+
+
+def make_upload(size: int, known_size: bool = True) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    block = os.urandom(WRITE_CHUNK)
+    for _ in range(size // WRITE_CHUNK):
+        spool.write(block)
+    spool.write(block[: size % WRITE_CHUNK])
+    spool.seek(0)
+    return UploadFile(
+        spool,
+        size=size if known_size else None,
+        filename="bench.pdf",
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+
+
+async def upload_read(client: StorageClient, file: UploadFile, max_bytes: int):
+    # What the routes did before: the whole file in memory as one request body
+    content = await file.read()
+    resp = await client.http.post(
+        f"{SUPABASE_URL}/storage/v1/object/Notes/bench.pdf",
+        headers=upload_headers(file, upsert=True),
+        content=content,
+    )
+    return resp.status_code in (200, 201)
+
+
+async def upload_stream(client: StorageClient, file: UploadFile, max_bytes: int):
+    return await client.upload("Notes", "bench.pdf", file, max_bytes, upsert=True)
+
+
+async def peak_mb(upload, client: StorageClient, size: int, concurrency: int) -> float:
+    files = [make_upload(size) for _ in range(concurrency)]
+    tracemalloc.start()
+    try:
+        results = await asyncio.gather(*(upload(client, f, size) for f in files))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        for f in files:
+            await f.close()
+    assert all(results)
+    return peak / 1024 / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+
+    client = StorageClient(http2=False)
+    sink = SinkTransport()
+    client._transport._transport = sink  # keep the metered/retrying wrapper, drop the network
+
+    print(f"{args.size_mb} MB files, tracemalloc peak")
+    for concurrency in sorted({1, args.concurrency}):
+        for name, upload in (("read()", upload_read), ("stream", upload_stream)):
+            peak = await peak_mb(upload, client, size, concurrency)
+            print(f"{concurrency:>3} concurrent  {name:>6}: {peak:7.1f} MB")
+
+    # Chunked upload (size unknown): must stop once the limit is passed
+    limit = size // 2
+    sink.received = 0
+    file = make_upload(size, known_size=False)
+    try:
+        await client.upload("Notes", "bench.pdf", file, limit)
+        print("size limit: NOT enforced")
+    except UploadTooLarge:
+        print(f"size limit: aborted after {sink.received / 1024 / 1024:.1f} MB sent (limit {limit / 1024 / 1024:.1f} MB)")
+    finally:
+        await file.close()
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
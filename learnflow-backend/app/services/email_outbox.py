@@ -0,0 +1,161 @@
+"""
+Transactional email outbox.
+
+Routes call `enqueue_email` on the same session that writes the OTP row, so the
+email exists if and only if that transaction commits. Dispatchers (one per app
+worker, see `run_outbox_dispatcher`) work in three steps:
+
+  1. claim: a short transaction picks due rows with `FOR UPDATE SKIP LOCKED`,
+     marks them "sending" with a lease (next_attempt_at = now + lease) and
+     commits; rows whose OTP already expired are marked "expired" instead
+  2. send through the SMTP pool, holding no locks and no DB connection
+  3. record the outcome of each row in a second short transaction
+
+A dispatcher that dies between 1 and 3 leaves its rows "sending"; they are
+claimed again once the lease runs out. The OTP in `params` is cleared as soon
+as a row reaches a final status (sent, failed or expired).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox
+from app.services.mailer import get_smtp_pool
+
+
+TEMPLATES = {
+    "otp": {
+        "subject": "Your OTP - LearnFlow",
+        "body": (
+            "Hi,\n\n"
+            "Your OTP for LearnFlow is: {otp}\n\n"
+            "This OTP is valid for {minutes} minutes.\n\n"
+            "If you did not request this, please ignore this email.\n\n"
+            "- LearnFlow Team"
+        ),
+    },
+}
+
+_wakeup = asyncio.Event()
+
+
+def enqueue_email(db: AsyncSession, to_email: str, template: str, params: dict, expires_at: Optional[datetime] = None):
+    """Stage an email on the caller's session; it is sent after the caller commits.
+
+    Pass the OTP's `expires_at` so the email is dropped instead of delivered late.
+    """
+    db.add(EmailOutbox(to_email=to_email, template=template, params=params, expires_at=expires_at))
+
+
+def notify_outbox():
+    """Wake the local dispatcher right away instead of waiting for the next poll."""
+    _wakeup.set()
+
+
+def render_email(row: EmailOutbox) -> EmailMessage:
+    template = TEMPLATES[row.template]
+    message = EmailMessage()
+    message["From"] = f"LearnFlow <{settings.MAIL_FROM}>"
+    message["Reply-To"] = settings.MAIL_FROM
+    message["To"] = row.to_email
+    message["Subject"] = template["subject"]
+    message.set_content(template["body"].format(**row.params))
+    return message
+
+
+async def _claim(limit: int, now: datetime) -> list:
+    """Mark a batch of due rows "sending" and return (id, message) pairs to deliver."""
+    lease = timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_LEASE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(EmailOutbox)
+            .filter(
+                EmailOutbox.status.in_(("pending", "sending")),
+                EmailOutbox.next_attempt_at <= now,
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = []
+        for row in result.scalars().all():
+            if row.expires_at is not None and row.expires_at <= now:
+                row.status = "expired"
+                row.params = {}
+                continue
+            claimed.append((row.id, render_email(row)))
+            row.status = "sending"
+            row.next_attempt_at = now + lease
+        await db.commit()
+    return claimed
+
+
+async def _send(message: EmailMessage) -> Optional[str]:
+    """Deliver one message; returns the error text, or None on success."""
+    try:
+        await get_smtp_pool().send(message)
+    except Exception as e:
+        print(f"Email sending failed: {e}")
+        return str(e)[:500] or type(e).__name__
+    return None
+
+
+async def _record(outcomes: dict):
+    """Store delivery results for claimed rows: id -> error text, or None if sent."""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(EmailOutbox).filter(EmailOutbox.id.in_(outcomes.keys())).with_for_update()
+        )
+        for row in result.scalars().all():
+            error = outcomes[row.id]
+            if error is None:
+                row.status = "sent"
+                row.sent_at = now
+                row.params = {}  # don't keep OTPs around once delivered
+                continue
+
+            row.attempts += 1
+            row.last_error = error
+            if row.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                row.status = "failed"
+                row.params = {}  # given up; the OTP must not outlive the row's usefulness
+            else:
+                row.status = "pending"
+                row.next_attempt_at = now + timedelta(seconds=2 ** row.attempts)
+        await db.commit()
+
+
+async def dispatch_outbox_batch(limit: int = None) -> int:
+    """Claim and send one batch of due emails. Returns how many rows were claimed."""
+    limit = limit or settings.EMAIL_OUTBOX_BATCH_SIZE
+    claimed = await _claim(limit, datetime.utcnow())
+    if not claimed:
+        return 0
+
+    errors = await asyncio.gather(*(_send(message) for _, message in claimed))
+    await _record({row_id: error for (row_id, _), error in zip(claimed, errors)})
+    return len(claimed)
+
+
+async def run_outbox_dispatcher():
+    """Drain the outbox until cancelled; started from the app lifespan."""
+    while True:
+        _wakeup.clear()
+        try:
+            claimed = await dispatch_outbox_batch()
+        except Exception as e:
+            print(f"Email outbox dispatch failed: {e}")
+            claimed = 0
+
+        if claimed >= settings.EMAIL_OUTBOX_BATCH_SIZE:
+            continue
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,168 @@
+"""
+SMTP connection pool — keeps authenticated STARTTLS sessions open between emails.
+
+Sessions are reused for up to SMTP_MAX_MESSAGES_PER_SESSION messages, and at most
+SMTP_POOL_SIZE of them exist at once. A session that fails mid-send is dropped and
+the message is retried once on a fresh connection. The pool is closed by the app
+lifespan.
+"""
+
+import asyncio
+import time
+from collections import deque
+from email.message import EmailMessage
+import aiosmtplib
+from app.core.config import settings
+
+
+class _Session:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str,
+        password: str,
+        max_size: int = 4,
+        max_messages_per_session: int = 100,
+        idle_timeout: float = 60,
+        timeout: float = 30,
+        start_tls: bool = True,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_messages_per_session = max_messages_per_session
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.start_tls = start_tls
+
+        self._slots = asyncio.Semaphore(max_size)
+        self._idle = []
+        self._closing = set()  # keeps discard tasks referenced until they finish
+
+        # Metrics
+        self.sent = 0
+        self.failed = 0
+        self.connects = 0
+        self.reconnects = 0
+        self._latencies = deque(maxlen=1000)  # seconds, most recent sends
+
+    async def _connect(self) -> _Session:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        self.connects += 1
+        return _Session(client)
+
+    async def _discard(self, session: _Session):
+        try:
+            await session.client.quit()
+        except Exception:
+            session.client.close()
+
+    async def _acquire(self) -> _Session:
+        now = time.monotonic()
+        while self._idle:
+            session = self._idle.pop()
+            if session.client.is_connected and now - session.last_used < self.idle_timeout:
+                return session
+            await self._discard(session)
+        return await self._connect()
+
+    def _release(self, session: _Session):
+        session.last_used = time.monotonic()
+        if session.sent >= self.max_messages_per_session:
+            task = asyncio.create_task(self._discard(session))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            self._idle.append(session)
+
+    async def send(self, message: EmailMessage):
+        start = time.perf_counter()
+        async with self._slots:
+            session = None
+            try:
+                session = await self._acquire()
+                try:
+                    await session.client.send_message(message)
+                except (aiosmtplib.SMTPServerDisconnected, ConnectionError, asyncio.TimeoutError):
+                    # Server dropped a pooled session; retry once on a new one
+                    session.client.close()
+                    self.reconnects += 1
+                    session = await self._connect()
+                    await session.client.send_message(message)
+            except Exception:
+                self.failed += 1
+                if session is not None:
+                    session.client.close()
+                raise
+
+            session.sent += 1
+            self._release(session)
+
+        self.sent += 1
+        self._latencies.append(time.perf_counter() - start)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await self._discard(session)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "idle_sessions": len(self._idle),
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p99": percentile(0.99),
+        }
+
+
+_pool = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    global _pool
+    if _pool is None:
+        _pool = SMTPPool(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME,
+            password=settings.MAIL_PASSWORD,
+            max_size=settings.SMTP_POOL_SIZE,
+            max_messages_per_session=settings.SMTP_MAX_MESSAGES_PER_SESSION,
+            idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        )
+    return _pool
+
+
+async def close_smtp_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
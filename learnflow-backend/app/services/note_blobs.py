@@ -0,0 +1,93 @@
+"""
+Content-addressed storage for note files.
+
+Uploads through the API are hashed (SHA-256) before they are stored. Every
+note with the same bytes points at one object, notes/blobs/{hash}{ext}, and
+note_blobs.ref_count counts those notes. A duplicate upload only bumps the
+counter; nothing is sent to storage.
+
+Locking: `acquire_note_blob` locks an existing row until the caller commits
+the note, and `release_note_file` deletes the object while holding the row
+lock and drops the row in the same transaction. An upload therefore either
+takes a reference before the release decrements, or waits until the row and
+object are gone and uploads a fresh copy.
+"""
+
+from typing import Optional
+from fastapi import UploadFile
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.note import NoteBlob
+from app.services.storage import invalidate_signed_url
+from app.services.storage_client import get_storage_client
+
+BUCKET = "Notes"
+BLOB_PREFIX = "notes/blobs"
+
+
+def blob_path(content_hash: str, ext: str) -> str:
+    return f"{BLOB_PREFIX}/{content_hash}{ext}"
+
+
+async def acquire_note_blob(
+    db: AsyncSession,
+    file: UploadFile,
+    content_hash: str,
+    ext: str,
+    max_bytes: int,
+) -> Optional[str]:
+    """Take a reference to the blob for `content_hash`, uploading it first if it's new.
+
+    Returns the storage path, or None if the upload failed. The reference is
+    committed together with the caller's note.
+    """
+    result = await db.execute(
+        select(NoteBlob).filter(NoteBlob.content_hash == content_hash).with_for_update()
+    )
+    blob = result.scalars().first()
+    if blob is not None:
+        blob.ref_count += 1
+        return blob.file_path
+
+    # New content. Concurrent uploads of the same bytes write the same object,
+    # so upsert and let the counter below sort out who was first.
+    path = blob_path(content_hash, ext)
+    if not await get_storage_client().upload(BUCKET, path, file, max_bytes, upsert=True):
+        return None
+
+    stmt = pg_insert(NoteBlob).values(
+        content_hash=content_hash, file_path=path, size=file.size or 0, ref_count=1,
+    )
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[NoteBlob.content_hash],
+            set_={"ref_count": NoteBlob.ref_count + 1},
+        ).returning(NoteBlob.file_path)
+    )
+    return result.scalar_one()
+
+
+async def release_note_file(db: AsyncSession, file_path: str) -> bool:
+    """Drop one note's reference to its file; delete the object once nothing uses it.
+
+    Files that aren't blobs (direct uploads, notes from before deduplication)
+    belong to a single note and are deleted right away. Returns False if the
+    storage delete failed; the caller should roll back.
+    """
+    result = await db.execute(
+        update(NoteBlob)
+        .where(NoteBlob.file_path == file_path)
+        .values(ref_count=NoteBlob.ref_count - 1)
+        .returning(NoteBlob.ref_count)
+    )
+    remaining = result.scalar_one_or_none()
+    if remaining is not None and remaining > 0:
+        return True
+
+    if not await get_storage_client().delete(BUCKET, [file_path]):
+        return False
+    if remaining is not None:
+        await db.execute(delete(NoteBlob).where(NoteBlob.file_path == file_path))
+    await invalidate_signed_url(BUCKET, file_path)
+    return True
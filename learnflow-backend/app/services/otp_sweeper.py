@@ -0,0 +1,74 @@
+"""
+Sweeper for expired OTP rows and finished outbox emails.
+
+Deletes in short, bounded batches (one transaction each) and skips rows that a
+request currently holds `FOR UPDATE`, so it never waits on or blocks the auth
+routes. Safe to run from several workers at once.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.verification import Verification, PasswordResetOTP, EmailChangeRequest
+from app.models.email_outbox import EmailOutbox
+
+
+def _sweep_targets(now: datetime):
+    outbox_cutoff = now - timedelta(hours=settings.EMAIL_OUTBOX_RETENTION_HOURS)
+    return [
+        (Verification, Verification.expires_at < now),
+        (PasswordResetOTP, PasswordResetOTP.expires_at < now),
+        (EmailChangeRequest, EmailChangeRequest.expires_at < now),
+        (EmailOutbox, EmailOutbox.status.in_(("sent", "failed", "expired")) & (EmailOutbox.created_at < outbox_cutoff)),
+        # Never dispatched (e.g. dispatcher disabled) and useless now; drop the OTP with it
+        (EmailOutbox, (EmailOutbox.status == "pending") & (EmailOutbox.expires_at < now)),
+    ]
+
+
+async def _delete_batch(model, condition, batch_size: int) -> int:
+    batch = (
+        select(model.id)
+        .filter(condition)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(model)
+            .where(model.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return result.rowcount
+
+
+async def sweep_expired_otps(batch_size: int = None) -> dict:
+    """Delete expired OTP rows and old outbox rows. Returns rows reclaimed per table."""
+    batch_size = batch_size or settings.OTP_SWEEP_BATCH_SIZE
+    reclaimed = {}
+
+    for model, condition in _sweep_targets(datetime.utcnow()):
+        total = 0
+        while True:
+            deleted = await _delete_batch(model, condition, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+        reclaimed[model.__tablename__] = reclaimed.get(model.__tablename__, 0) + total
+
+    return reclaimed
+
+
+async def run_otp_sweeper():
+    """Sweep every OTP_SWEEP_INTERVAL_SECONDS until cancelled; started from the app lifespan."""
+    while True:
+        try:
+            reclaimed = await sweep_expired_otps()
+            if any(reclaimed.values()):
+                print(f"OTP sweeper reclaimed rows: {reclaimed}")
+        except Exception as e:
+            print(f"OTP sweep failed: {e}")
+        await asyncio.sleep(settings.OTP_SWEEP_INTERVAL_SECONDS)
@@ -7,18 +7,24 @@ Two queues:
 
 import json
 import os
-import boto3
+from functools import lru_cache
 
 AWS_REGION = os.getenv("AWS_REGION", "ap-south-1")
 
-sqs = boto3.client("sqs", region_name=AWS_REGION)
-
 AI_QUEUE_URL = os.getenv("AI_QUEUE_URL", "")
 TASK_QUEUE_URL = os.getenv("TASK_QUEUE_URL", "")
 
 
+@lru_cache(maxsize=1)
+def get_sqs():
+    # boto3 takes ~200 ms to import and build a client; defer it until the first message
+    import boto3
+
+    return boto3.client("sqs", region_name=AWS_REGION)
+
+
 def _send(queue_url: str, action: str, payload: dict) -> str:
-    response = sqs.send_message(
+    response = get_sqs().send_message(
         QueueUrl=queue_url,
         MessageBody=json.dumps({"action": action, "payload": payload}),
     )
@@ -36,12 +42,14 @@ def trigger_roadmap_generation(student_id: str, topic: str, level: str, context:
     })
 
 
-def trigger_note_summarization(note_id: str, student_id: str, file_url: str, action: str = "summary") -> str:
+def trigger_note_summarization(note_id: str, student_id: str, file_url: str, action: str = "summary", content_hash: str = None) -> str:
+    # content_hash lets the processor reuse results for identical files without downloading this one
     return _send(AI_QUEUE_URL, "summarize_note", {
         "note_id": note_id,
         "student_id": student_id,
         "file_url": file_url,
         "type": action,
+        "content_hash": content_hash,
     })
 
 
@@ -0,0 +1,340 @@
+"""
+Supabase Storage helpers.
+
+Route handlers go through the shared StorageClient (app.services.storage_client);
+the functions here take its httpx client.
+
+`sign_urls` signs many objects of one bucket with the multi-path endpoint
+(POST /object/sign/{bucket} with "paths"), in chunks of
+STORAGE_SIGN_BATCH_SIZE sent concurrently. If a chunk fails it falls back to
+signing those paths one by one, at most STORAGE_SIGN_CONCURRENCY at a time.
+
+Signed URLs are cached per (bucket, path) and reused while they stay valid
+for at least `min_valid` seconds more (SIGNED_URL_CACHE_MARGIN_SECONDS by
+default), so repeated listings make no storage calls. Callers that delete or
+overwrite an object must call `invalidate_signed_url`.
+
+For direct uploads, `create_upload_url` signs an upload URL the client PUTs
+the file to, and `object_info` / `delete_objects` let the confirm step check
+what actually arrived.
+
+Uploads through the API are streamed from the UploadFile spool with `stream_upload` instead
+of being read into memory; it raises UploadTooLarge as soon as the byte
+count passes the limit. `hash_upload` reads the spool the same way to compute
+its SHA-256.
+
+Cache backends:
+  - MemorySignedURLBackend: per worker, bounded (SIGNED_URL_CACHE_MAX_ENTRIES)
+  - RedisSignedURLBackend: shared across workers (SIGNED_URL_CACHE_REDIS_URL)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+import httpx
+from fastapi import UploadFile
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Marks a POST as safe to retry (see storage_client); signing has no side effects
+IDEMPOTENT = {"idempotent": True}
+
+
+class UploadTooLarge(Exception):
+    """The upload passed its size limit; nothing more is read from the spool."""
+
+
+def upload_headers(file: UploadFile, upsert: bool) -> dict:
+    headers = {
+        **_auth_headers(),
+        "Content-Type": file.content_type,
+        "x-upsert": "true" if upsert else "false",
+    }
+    # Known from the spool, so storage gets a plain body instead of a chunked one
+    if file.size is not None:
+        headers["Content-Length"] = str(file.size)
+    return headers
+
+
+async def stream_upload(file: UploadFile, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """Yield the uploaded file in chunks; at most one chunk is held in memory."""
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f"{file.size} bytes exceeds {max_bytes}")
+
+    await file.seek(0)
+    received = 0
+    while chunk := await file.read(chunk_size):
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(f"more than {max_bytes} bytes")
+        yield chunk
+
+
+async def hash_upload(file: UploadFile, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """SHA-256 hex digest of the uploaded file, read chunk by chunk. Raises UploadTooLarge."""
+    digest = hashlib.sha256()
+    async for chunk in stream_upload(file, max_bytes, chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _auth_headers() -> dict:
+    return {"Authorization": f"Bearer {SUPABASE_KEY}"}
+
+
+def _public_url(signed_path: str) -> str:
+    # Supabase returns the signed URL relative to /storage/v1
+    return f"{SUPABASE_URL}/storage/v1{signed_path}"
+
+
+class MemorySignedURLBackend:
+    def __init__(self, maxsize: int):
+        # Entries carry their own TTL (the URL lifetime); the default only caps it
+        self._cache = TTLCache(maxsize=maxsize, ttl=7 * 24 * 3600)
+
+    async def get_many(self, keys: list) -> dict:
+        found = {}
+        for key in keys:
+            value = self._cache.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def set_many(self, entries: dict, ttl: float):
+        for key, value in entries.items():
+            self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str):
+        self._cache.invalidate(key)
+
+
+class RedisSignedURLBackend:
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency, only needed for a shared backend
+
+        # Fail fast when Redis is unreachable; SignedURLCache then treats it as a miss
+        self._redis = redis.from_url(
+            url,
+            socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+        )
+
+    async def get_many(self, keys: list) -> dict:
+        values = await self._redis.mget([f"su:{key}" for key in keys])
+        return {key: tuple(json.loads(value)) for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, entries: dict, ttl: float):
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in entries.items():
+            pipe.set(f"su:{key}", json.dumps(value), ex=max(1, int(ttl)))
+        await pipe.execute()
+
+    async def delete(self, key: str):
+        await self._redis.delete(f"su:{key}")
+
+
+class SignedURLCache:
+    """(bucket, path) -> (url, expires_at) with hit-rate counters. Backend errors count as misses."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_many(self, bucket: str, paths: list, min_valid: float) -> dict:
+        try:
+            found = await self.backend.get_many([f"{bucket}/{path}" for path in paths])
+        except Exception as e:
+            self.errors += 1
+            print(f"Signed URL cache read failed: {e}")
+            found = {}
+
+        deadline = time.time() + min_valid
+        urls = {}
+        for path in paths:
+            entry = found.get(f"{bucket}/{path}")
+            if entry is not None and entry[1] >= deadline:
+                urls[path] = entry[0]
+        self.hits += len(urls)
+        self.misses += len(paths) - len(urls)
+        return urls
+
+    async def set_many(self, bucket: str, urls: dict, expires_in: int):
+        expires_at = time.time() + expires_in
+        entries = {f"{bucket}/{path}": (url, expires_at) for path, url in urls.items() if url}
+        if not entries:
+            return
+        try:
+            await self.backend.set_many(entries, ttl=expires_in)
+        except Exception as e:
+            self.errors += 1
+            print(f"Signed URL cache write failed: {e}")
+
+    async def invalidate(self, bucket: str, path: str):
+        try:
+            await self.backend.delete(f"{bucket}/{path}")
+        except Exception as e:
+            self.errors += 1
+            print(f"Signed URL cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+_url_cache: Optional[SignedURLCache] = None
+
+
+def get_signed_url_cache() -> Optional[SignedURLCache]:
+    global _url_cache
+    if _url_cache is None and settings.SIGNED_URL_CACHE_ENABLED:
+        if settings.SIGNED_URL_CACHE_REDIS_URL:
+            backend = RedisSignedURLBackend(settings.SIGNED_URL_CACHE_REDIS_URL)
+        else:
+            backend = MemorySignedURLBackend(settings.SIGNED_URL_CACHE_MAX_ENTRIES)
+        _url_cache = SignedURLCache(backend)
+    return _url_cache
+
+
+async def invalidate_signed_url(bucket: str, path: str):
+    """Forget the cached URL after the object was deleted or overwritten."""
+    cache = get_signed_url_cache()
+    if cache is not None:
+        await cache.invalidate(bucket, path)
+
+
+async def create_upload_url(client: httpx.AsyncClient, bucket: str, path: str, upsert: bool = False):
+    """Signed URL the client can upload one object to (valid for 2 hours), or None on failure."""
+    try:
+        resp = await client.post(
+            f"{SUPABASE_URL}/storage/v1/object/upload/sign/{bucket}/{path}",
+            headers={**_auth_headers(), "x-upsert": "true" if upsert else "false"},
+            extensions=IDEMPOTENT,
+        )
+        if resp.status_code == 200:
+            return _public_url(resp.json()["url"])
+        print(f"Upload URL for {bucket}/{path} returned {resp.status_code}")
+    except Exception as e:
+        print(f"Upload URL for {bucket}/{path} failed: {e}")
+    return None
+
+
+async def object_info(client: httpx.AsyncClient, bucket: str, path: str):
+    """(size in bytes, content type) of a stored object, or None if it doesn't exist."""
+    resp = await client.head(
+        f"{SUPABASE_URL}/storage/v1/object/{bucket}/{path}",
+        headers=_auth_headers(),
+    )
+    if resp.status_code in (400, 404):
+        return None
+    resp.raise_for_status()
+    content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+    return int(resp.headers.get("content-length", 0)), content_type
+
+
+async def delete_objects(client: httpx.AsyncClient, bucket: str, paths: list) -> bool:
+    # httpx's delete() takes no body, so go through request()
+    resp = await client.request(
+        "DELETE",
+        f"{SUPABASE_URL}/storage/v1/object/{bucket}",
+        headers=_auth_headers(),
+        json={"prefixes": paths},
+    )
+    return resp.status_code in (200, 204)
+
+
+async def sign_url(client: httpx.AsyncClient, bucket: str, path: str, expires_in: int):
+    """Signed URL for one object, or None if it can't be signed."""
+    try:
+        resp = await client.post(
+            f"{SUPABASE_URL}/storage/v1/object/sign/{bucket}/{path}",
+            headers=_auth_headers(),
+            json={"expiresIn": expires_in},
+            extensions=IDEMPOTENT,
+        )
+        if resp.status_code == 200:
+            return _public_url(resp.json()["signedURL"])
+    except Exception as e:
+        print(f"Signing {bucket}/{path} failed: {e}")
+    return None
+
+
+async def _sign_chunk(client: httpx.AsyncClient, bucket: str, paths: list, expires_in: int, slots: asyncio.Semaphore):
+    try:
+        resp = await client.post(
+            f"{SUPABASE_URL}/storage/v1/object/sign/{bucket}",
+            headers=_auth_headers(),
+            json={"expiresIn": expires_in, "paths": paths},
+            extensions=IDEMPOTENT,
+        )
+        if resp.status_code == 200:
+            return {
+                item["path"]: _public_url(item["signedURL"]) if item.get("signedURL") else None
+                for item in resp.json()
+            }
+        print(f"Batch signing in {bucket} returned {resp.status_code}; signing one by one")
+    except Exception as e:
+        print(f"Batch signing in {bucket} failed, signing one by one: {e}")
+
+    async def one(path):
+        async with slots:
+            return path, await sign_url(client, bucket, path, expires_in)
+
+    return dict(await asyncio.gather(*(one(path) for path in paths)))
+
+
+async def sign_urls(
+    client: httpx.AsyncClient,
+    bucket: str,
+    paths: list,
+    expires_in: int,
+    min_valid: Optional[float] = None,
+) -> dict:
+    """Map each path to a signed URL valid for at least `min_valid` more seconds (None where signing failed)."""
+    unique = list(dict.fromkeys(paths))
+    if not unique:
+        return {}
+
+    if min_valid is None:
+        min_valid = settings.SIGNED_URL_CACHE_MARGIN_SECONDS
+    cache = get_signed_url_cache() if min_valid < expires_in else None
+    signed = await cache.get_many(bucket, unique, min_valid) if cache else {}
+    missing = [path for path in unique if path not in signed]
+    if not missing:
+        return signed
+
+    fresh = await _sign_many(client, bucket, missing, expires_in)
+    if cache:
+        await cache.set_many(bucket, fresh, expires_in)
+    signed.update(fresh)
+    return signed
+
+
+async def _sign_many(client: httpx.AsyncClient, bucket: str, unique: list, expires_in: int) -> dict:
+    size = settings.STORAGE_SIGN_BATCH_SIZE
+    slots = asyncio.Semaphore(settings.STORAGE_SIGN_CONCURRENCY)
+    chunks = await asyncio.gather(*(
+        _sign_chunk(client, bucket, unique[i:i + size], expires_in, slots)
+        for i in range(0, len(unique), size)
+    ))
+
+    signed = {}
+    for chunk in chunks:
+        signed.update(chunk)
+    return signed
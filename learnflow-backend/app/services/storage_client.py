@@ -0,0 +1,203 @@
+"""
+Shared HTTP client for Supabase Storage.
+
+One httpx.AsyncClient per worker keeps connections to storage alive between
+requests (HTTP/2 when the `h2` package is installed, so concurrent calls share
+one TLS connection), instead of every handler opening its own client and
+paying a new TCP + TLS handshake. It is created on first use and closed by the
+app lifespan.
+
+Retries:
+  - failed connects are retried for every request (nothing has been sent yet)
+  - read/write errors and 502/503/504 are retried only for idempotent calls:
+    GET/HEAD/DELETE, and requests sent with `extensions=IDEMPOTENT` (URL signing)
+"""
+
+import asyncio
+import importlib.util
+import time
+from collections import Counter, deque
+from typing import Optional
+import httpx
+from fastapi import UploadFile
+from app.core.config import settings
+from app.services.storage import (
+    SUPABASE_URL, sign_urls, upload_headers, stream_upload,
+    create_upload_url, object_info, delete_objects,
+)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "DELETE", "OPTIONS"}
+RETRY_STATUSES = {502, 503, 504}
+# Connect failures are already retried by the inner transport
+RETRY_ERRORS = (httpx.ReadError, httpx.WriteError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """Times each request, notes whether it opened a new connection, and retries idempotent ones."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, retries: int, backoff: float):
+        self._transport = transport
+        self.retries = retries
+        self.backoff = backoff
+
+        # Metrics
+        self.requests = 0
+        self.new_connections = 0
+        self.retried = 0
+        self.failed = 0
+        self.http_versions = Counter()
+        self._latencies = deque(maxlen=1000)  # seconds, most recent requests
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS or request.extensions.get("idempotent")
+        attempt = 0
+        while True:
+            connected = False
+
+            async def trace(event: str, info: dict):
+                nonlocal connected
+                if event == "connection.connect_tcp.complete":
+                    connected = True
+
+            request.extensions["trace"] = trace
+            start = time.perf_counter()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RETRY_ERRORS:
+                if idempotent and attempt < self.retries:
+                    attempt += 1
+                    self.retried += 1
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                    continue
+                self.failed += 1
+                raise
+            except Exception:
+                self.failed += 1
+                raise
+
+            self.requests += 1
+            self.new_connections += connected
+            self.http_versions[response.extensions.get("http_version", b"").decode() or "unknown"] += 1
+            self._latencies.append(time.perf_counter() - start)
+
+            if idempotent and response.status_code in RETRY_STATUSES and attempt < self.retries:
+                await response.aclose()
+                attempt += 1
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+            return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class StorageClient:
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30,
+        connect_timeout: float = 5,
+        timeout: float = 30,
+        pool_timeout: float = 5,
+        upload_timeout: float = 120,
+        retries: int = 2,
+        retry_backoff: float = 0.2,
+    ):
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.upload_timeout = upload_timeout
+        self._transport = _MeteredTransport(
+            httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                retries=retries,
+            ),
+            retries=retries,
+            backoff=retry_backoff,
+        )
+        self.http = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout),
+        )
+
+    async def upload(self, bucket: str, path: str, file: UploadFile, max_bytes: int, upsert: bool = False) -> bool:
+        """Stream an UploadFile to storage. Raises UploadTooLarge past `max_bytes`."""
+        resp = await self.http.post(
+            f"{SUPABASE_URL}/storage/v1/object/{bucket}/{path}",
+            headers=upload_headers(file, upsert),
+            content=stream_upload(file, max_bytes),
+            timeout=httpx.Timeout(self.upload_timeout, connect=self.http.timeout.connect, pool=self.http.timeout.pool),
+        )
+        return resp.status_code in (200, 201)
+
+    async def sign(self, bucket: str, path: str, expires_in: int) -> Optional[str]:
+        return (await self.sign_many(bucket, [path], expires_in)).get(path)
+
+    async def sign_many(self, bucket: str, paths: list, expires_in: int, min_valid: Optional[float] = None) -> dict:
+        return await sign_urls(self.http, bucket, paths, expires_in, min_valid=min_valid)
+
+    async def delete(self, bucket: str, paths: list) -> bool:
+        return await delete_objects(self.http, bucket, paths)
+
+    async def create_upload_url(self, bucket: str, path: str, upsert: bool = False) -> Optional[str]:
+        return await create_upload_url(self.http, bucket, path, upsert=upsert)
+
+    async def object_info(self, bucket: str, path: str):
+        return await object_info(self.http, bucket, path)
+
+    async def close(self):
+        await self.http.aclose()
+
+    def stats(self) -> dict:
+        t = self._transport
+        latencies = sorted(t._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "http2": self.http2,
+            "requests": t.requests,
+            "new_connections": t.new_connections,
+            "connection_reuse_rate": round(1 - t.new_connections / t.requests, 4) if t.requests else None,
+            "retried": t.retried,
+            "failed": t.failed,
+            "http_versions": dict(t.http_versions),
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p99": percentile(0.99),
+        }
+
+
+_client = None
+
+
+def get_storage_client() -> StorageClient:
+    global _client
+    if _client is None:
+        _client = StorageClient(
+            http2=settings.STORAGE_HTTP2,
+            max_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.STORAGE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.STORAGE_KEEPALIVE_EXPIRY_SECONDS,
+            connect_timeout=settings.STORAGE_CONNECT_TIMEOUT_SECONDS,
+            timeout=settings.STORAGE_TIMEOUT_SECONDS,
+            pool_timeout=settings.STORAGE_POOL_TIMEOUT_SECONDS,
+            upload_timeout=settings.STORAGE_UPLOAD_TIMEOUT_SECONDS,
+            retries=settings.STORAGE_RETRIES,
+        )
+    return _client
+
+
+async def close_storage_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,110 @@
+"""
+Apply a batch of task create/update/delete operations in one transaction.
+
+Round trips per batch, independent of its size:
+  - creates: one multi-row INSERT ... RETURNING
+  - updates: one UPDATE ... FROM (VALUES ...) ... RETURNING per distinct set
+    of changed fields (a planner marking tasks done is a single statement)
+  - deletes: one DELETE ... RETURNING
+Updates and deletes are scoped to the student, so ids that don't exist or
+belong to someone else come back as "not_found" instead of failing the batch.
+Rows to be updated are locked first (one SELECT ... FOR UPDATE) so the daily
+stats delta can subtract their exact old values; the stats upsert is one more
+statement.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import column, delete, insert, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task
+from app.schema.task import TaskBatchCreate, TaskBatchUpdate
+from app.services.task_stats import TaskStatsDelta, apply_task_stats
+
+
+async def _insert_tasks(db: AsyncSession, student_id, creates):
+    rows = [{"student_id": student_id, **op.task.model_dump()} for _, op in creates]
+    result = await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows)
+    return result.all()
+
+
+async def _update_tasks(db: AsyncSession, student_id, updates, now: datetime, stats: TaskStatsDelta):
+    """Return {task_id: Task} for the rows that were updated."""
+    locked = await db.execute(
+        select(Task.id, Task.student_id, Task.planned_date, Task.status, Task.estimated_time)
+        .where(Task.student_id == student_id, Task.id.in_([op.id for _, op in updates]))
+        .with_for_update()
+    )
+    for old in locked.all():
+        stats.add_task(old, -1)
+
+    groups = defaultdict(list)
+    for _, op in updates:
+        changes = op.changes.model_dump(exclude_unset=True)
+        groups[tuple(sorted(changes))].append((op.id, changes))
+
+    updated = {}
+    for fields, items in groups.items():
+        table = Task.__table__
+        data = values(
+            column("id", table.c.id.type),
+            *(column(field, table.c[field].type) for field in fields),
+            name="changes",
+        ).data([(task_id, *(changes[field] for field in fields)) for task_id, changes in items])
+
+        stmt = (
+            update(Task)
+            .where(Task.id == data.c.id, Task.student_id == student_id)
+            .values({**{field: data.c[field] for field in fields}, "updated_at": now})
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        for task in (await db.scalars(stmt)).all():
+            updated[task.id] = task
+            stats.add_task(task)
+    return updated
+
+
+async def apply_task_batch(db: AsyncSession, student_id, operations) -> list:
+    """Run the operations and commit; returns one result dict per operation, in order."""
+    creates, updates, deletes = [], [], []
+    for index, op in enumerate(operations):
+        if isinstance(op, TaskBatchCreate):
+            creates.append((index, op))
+        elif isinstance(op, TaskBatchUpdate):
+            updates.append((index, op))
+        else:
+            deletes.append((index, op))
+
+    results = [None] * len(operations)
+    stats = TaskStatsDelta()
+
+    if creates:
+        for (index, op), task in zip(creates, await _insert_tasks(db, student_id, creates)):
+            stats.add_task(task)
+            results[index] = {"index": index, "op": op.op, "status": "created", "id": task.id, "task": task}
+
+    if updates:
+        updated = await _update_tasks(db, student_id, updates, datetime.utcnow(), stats)
+        for index, op in updates:
+            task = updated.get(op.id)
+            status = "updated" if task is not None else "not_found"
+            results[index] = {"index": index, "op": op.op, "status": status, "id": op.id, "task": task}
+
+    if deletes:
+        result = await db.execute(
+            delete(Task)
+            .where(Task.student_id == student_id, Task.id.in_([op.id for _, op in deletes]))
+            .returning(Task.id, Task.student_id, Task.planned_date, Task.status, Task.estimated_time)
+        )
+        deleted = set()
+        for old in result.all():
+            deleted.add(old.id)
+            stats.add_task(old, -1)
+        for index, op in deletes:
+            status = "deleted" if op.id in deleted else "not_found"
+            results[index] = {"index": index, "op": op.op, "status": status, "id": op.id}
+
+    await apply_task_stats(db, stats)
+    await db.commit()
+    return results
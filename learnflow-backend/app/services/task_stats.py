@@ -0,0 +1,55 @@
+"""
+Incremental maintenance of student_daily_task_stats.
+
+Every write to `tasks` records what it removed and added as a TaskStatsDelta
+(old row with sign -1, new row with sign +1) and applies it with
+`apply_task_stats` in the same transaction, as a single multi-row
+INSERT ... ON CONFLICT DO UPDATE of the per-day counters. Old values must be
+read under a row lock (or from DELETE ... RETURNING) so concurrent writers
+cannot make the counters drift.
+"""
+
+from collections import defaultdict
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import StudentDailyTaskStats
+
+COUNTERS = ("total", "completed", "pending", "missed", "planned_hours")
+
+
+class TaskStatsDelta:
+    def __init__(self):
+        self._days = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    def add(self, student_id, day, status, estimated_time, sign: int = 1):
+        counters = self._days[(student_id, day)]
+        counters["total"] += sign
+        status = status or "pending"  # column default, not yet applied before flush
+        if status in ("completed", "pending", "missed"):
+            counters[status] += sign
+        counters["planned_hours"] += sign * (estimated_time or 0)
+
+    def add_task(self, task, sign: int = 1):
+        self.add(task.student_id, task.planned_date, task.status, task.estimated_time, sign)
+
+    def rows(self) -> list:
+        # Sorted so every writer locks stats rows in the same order; concurrent
+        # multi-day upserts (batches, the nightly rollover) would deadlock otherwise
+        return [
+            {"student_id": student_id, "day": day, **counters}
+            for (student_id, day), counters in sorted(self._days.items(), key=lambda item: item[0])
+            if any(counters.values())
+        ]
+
+
+async def apply_task_stats(db: AsyncSession, delta: TaskStatsDelta):
+    rows = delta.rows()
+    if not rows:
+        return
+
+    stmt = pg_insert(StudentDailyTaskStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StudentDailyTaskStats.student_id, StudentDailyTaskStats.day],
+        set_={name: getattr(StudentDailyTaskStats, name) + stmt.excluded[name] for name in COUNTERS},
+    )
+    await db.execute(stmt)
@@ -0,0 +1,57 @@
+"""email outbox table and OTP sweeper indexes
+
+Uses IF NOT EXISTS because databases booted with the old create_all may
+already have the email_outbox table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("to_email", sa.String(), nullable=False),
+        sa.Column("template", sa.String(), nullable=False),
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_email_outbox_pending", "email_outbox", ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"), if_not_exists=True,
+    )
+    op.create_index(
+        "ix_email_outbox_finished", "email_outbox", ["created_at"],
+        postgresql_where=sa.text("status <> 'pending'"), if_not_exists=True,
+    )
+
+    op.create_index("ix_verifications_email", "verifications", ["email"], if_not_exists=True)
+    op.create_index("ix_verifications_expires_at", "verifications", ["expires_at"], if_not_exists=True)
+    op.create_index("ix_password_reset_otps_expires_at", "password_reset_otps", ["expires_at"], if_not_exists=True)
+    op.create_index("ix_email_change_requests_expires_at", "email_change_requests", ["expires_at"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_email_change_requests_expires_at", table_name="email_change_requests")
+    op.drop_index("ix_password_reset_otps_expires_at", table_name="password_reset_otps")
+    op.drop_index("ix_verifications_expires_at", table_name="verifications")
+    op.drop_index("ix_verifications_email", table_name="verifications")
+    op.drop_table("email_outbox")
@@ -0,0 +1,50 @@
+"""composite and foreign-key indexes for hot queries
+
+Built with CREATE INDEX CONCURRENTLY so tasks/notes stay writable while the
+indexes build; that cannot run inside a transaction, hence the autocommit
+block. If a concurrent build fails it leaves an INVALID index behind: drop
+it and re-run the upgrade.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial-index predicate)
+INDEXES = [
+    ("ix_tasks_student_planned_status", "tasks", ["student_id", "planned_date", "status"], None),
+    ("ix_tasks_student_created", "tasks", ["student_id", "created_at"], None),
+    ("ix_tasks_pending_planned_date", "tasks", ["planned_date"], "status = 'pending'"),
+    ("ix_notes_student_created", "notes", ["student_id", "created_at"], None),
+    ("ix_steps_roadmap_id", "steps", ["roadmap_id"], None),
+    ("ix_topics_step_id", "topics", ["step_id"], None),
+    ("ix_user_roadmaps_student_id", "user_roadmaps", ["student_id"], None),
+    ("ix_user_roadmaps_roadmap_id", "user_roadmaps", ["roadmap_id"], None),
+    ("ix_user_topic_progress_user_roadmap_id", "user_topic_progress", ["user_roadmap_id"], None),
+    ("ix_user_topic_progress_topic_id", "user_topic_progress", ["topic_id"], None),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
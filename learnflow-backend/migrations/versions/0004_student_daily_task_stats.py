@@ -0,0 +1,51 @@
+"""student_daily_task_stats table, backfilled from tasks
+
+From here on the counters are maintained incrementally by the API and the
+rollover job. Run this migration before deploying the code that maintains
+them; task writes made in between are not reflected until the backfill
+statement below is re-run.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_daily_task_stats",
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("pending", sa.Integer(), nullable=False),
+        sa.Column("missed", sa.Integer(), nullable=False),
+        sa.Column("planned_hours", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["student_id"], ["students.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("student_id", "day"),
+    )
+    op.execute(
+        """INSERT INTO student_daily_task_stats
+               (student_id, day, total, completed, pending, missed, planned_hours)
+           SELECT student_id, planned_date,
+                  COUNT(*),
+                  COUNT(*) FILTER (WHERE status = 'completed'),
+                  COUNT(*) FILTER (WHERE COALESCE(status, 'pending') = 'pending'),
+                  COUNT(*) FILTER (WHERE status = 'missed'),
+                  COALESCE(SUM(estimated_time), 0)
+           FROM tasks
+           GROUP BY student_id, planned_date"""
+    )
+
+
+def downgrade():
+    op.drop_table("student_daily_task_stats")
@@ -0,0 +1,46 @@
+"""Content-addressed note files: notes.content_hash, note_blobs, note_content_results
+
+Existing notes keep their per-upload files and a NULL content_hash; the AI
+processor fills the hash in the next time it processes them.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("notes", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_table(
+        "note_blobs",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("content_hash"),
+        sa.UniqueConstraint("file_path"),
+    )
+    op.create_table(
+        "note_content_results",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("action_type", sa.String(), nullable=False),
+        sa.Column("result_data", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("content_hash", "action_type"),
+    )
+
+
+def downgrade():
+    op.drop_table("note_content_results")
+    op.drop_table("note_blobs")
+    op.drop_column("notes", "content_hash")
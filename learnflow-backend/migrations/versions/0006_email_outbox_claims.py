@@ -0,0 +1,44 @@
+"""email_outbox: expires_at, and indexes for the "sending" / "expired" statuses
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("email_outbox", sa.Column("expires_at", sa.DateTime(), nullable=True))
+
+    # The table only holds recent emails, so rebuilding its partial indexes is cheap
+    op.drop_index("ix_email_outbox_pending", table_name="email_outbox")
+    op.drop_index("ix_email_outbox_finished", table_name="email_outbox")
+    op.create_index(
+        "ix_email_outbox_pending", "email_outbox", ["next_attempt_at"],
+        postgresql_where=sa.text("status IN ('pending', 'sending')"),
+    )
+    op.create_index(
+        "ix_email_outbox_finished", "email_outbox", ["created_at"],
+        postgresql_where=sa.text("status IN ('sent', 'failed', 'expired')"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_email_outbox_finished", table_name="email_outbox")
+    op.drop_index("ix_email_outbox_pending", table_name="email_outbox")
+    op.create_index(
+        "ix_email_outbox_pending", "email_outbox", ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "ix_email_outbox_finished", "email_outbox", ["created_at"],
+        postgresql_where=sa.text("status <> 'pending'"),
+    )
+    op.drop_column("email_outbox", "expires_at")
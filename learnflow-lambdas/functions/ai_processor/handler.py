@@ -4,7 +4,7 @@ Trigger: SQS (single queue, routes by "action" field)
 
 Supported actions:
   - generate_roadmap
-  - summarize_note
+  - summarize_note (results are shared between notes with the same content hash)
   - generate_quiz
 
 Input format:
@@ -12,6 +12,7 @@ Input format:
 """
 
 import asyncio
+import hashlib
 import json
 import sys
 sys.path.insert(0, "/opt/python")
@@ -172,12 +173,24 @@ async def _summarize_note(payload: dict) -> dict:
     student_id = payload["student_id"]
     file_url = payload["file_url"]
     action = payload.get("type", "summary")
+    content_hash = payload.get("content_hash")
 
-    text = await _fetch_note_content(file_url)
-    if not text:
+    # Identical files share results, so a known hash may not need the file or the LLM at all
+    if content_hash and _reuse_results(note_id, student_id, content_hash, action):
+        return {"note_id": note_id, "action": "summarize_note", "status": "reused"}
+
+    content = await _fetch_note_content(file_url)
+    if not content:
         return {"note_id": note_id, "status": "failed", "reason": "empty_content"}
 
-    text = text[:4000]
+    if not content_hash:
+        # Uploaded before hashing, or directly to storage: hash it now so later copies match
+        content_hash = hashlib.sha256(content).hexdigest()
+        _set_content_hash(note_id, content_hash)
+        if _reuse_results(note_id, student_id, content_hash, action):
+            return {"note_id": note_id, "action": "summarize_note", "status": "reused"}
+
+    text = content.decode("utf-8", errors="replace")[:4000]
 
     prompt_map = {
         "summary": SUMMARY_PROMPT,
@@ -192,11 +205,11 @@ async def _summarize_note(payload: dict) -> dict:
     if not parsed:
         return {"note_id": note_id, "status": "failed", "reason": "parse_error"}
 
-    _store_summary(note_id, student_id, action, parsed)
+    _store_summary(note_id, student_id, action, parsed, content_hash)
     return {"note_id": note_id, "action": "summarize_note", "status": "success"}
 
 
-async def _fetch_note_content(file_url: str) -> str:
+async def _fetch_note_content(file_url: str) -> bytes:
     import httpx
     from shared.config import config
 
@@ -208,14 +221,50 @@ async def _fetch_note_content(file_url: str) -> str:
             json={"expiresIn": 300},
         )
         if resp.status_code != 200:
-            return ""
+            return b""
         signed = resp.json()
         download_url = f"{config.SUPABASE_URL}/storage/v1{signed['signedURL']}"
         file_resp = await client.get(download_url)
-        return file_resp.text if file_resp.status_code == 200 else ""
+        return file_resp.content if file_resp.status_code == 200 else b""
+
+
+def _reuse_results(note_id: str, student_id: str, content_hash: str, action: str) -> bool:
+    """Copy every result already computed for this content onto the note.
+
+    Returns True if the requested action was among them.
+    """
+    with get_connection() as conn:
+        with get_cursor(conn) as cur:
+            cur.execute(
+                "SELECT action_type, result_data FROM note_content_results WHERE content_hash = %s",
+                (content_hash,),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                return False
+
+            cur.executemany(
+                """INSERT INTO note_summaries (note_id, student_id, action_type, result_data)
+                   VALUES (%s, %s, %s, %s)
+                   ON CONFLICT (note_id, action_type)
+                   DO UPDATE SET result_data = EXCLUDED.result_data""",
+                [(note_id, student_id, row["action_type"], json.dumps(row["result_data"])) for row in rows],
+            )
+            conn.commit()
+    return any(row["action_type"] == action for row in rows)
 
 
-def _store_summary(note_id: str, student_id: str, action: str, data):
+def _set_content_hash(note_id: str, content_hash: str):
+    with get_connection() as conn:
+        with get_cursor(conn) as cur:
+            cur.execute(
+                "UPDATE notes SET content_hash = %s WHERE id = %s AND content_hash IS NULL",
+                (content_hash, note_id),
+            )
+            conn.commit()
+
+
+def _store_summary(note_id: str, student_id: str, action: str, data, content_hash: str):
     with get_connection() as conn:
         with get_cursor(conn) as cur:
             cur.execute(
@@ -225,6 +274,14 @@ def _store_summary(note_id: str, student_id: str, action: str, data):
                    DO UPDATE SET result_data = EXCLUDED.result_data""",
                 (note_id, student_id, action, json.dumps(data)),
             )
+            # Shared with every other note that has the same content
+            cur.execute(
+                """INSERT INTO note_content_results (content_hash, action_type, result_data, created_at)
+                   VALUES (%s, %s, %s, now())
+                   ON CONFLICT (content_hash, action_type)
+                   DO UPDATE SET result_data = EXCLUDED.result_data""",
+                (content_hash, action, json.dumps(data)),
+            )
             conn.commit()
 
 
@@ -6,12 +6,14 @@ Supported actions:
   - send_email
   - analyze_weak_topics
   - schedule_revisions (also triggered by daily cron)
+  - sweep_expired_otps (also triggered by daily cron)
+  - rollover_tasks (also triggered by daily cron)
 
 Input format:
   { "action": "send_email", "payload": { ... } }
 
 For EventBridge cron:
-  Automatically runs schedule_revisions
+  Automatically runs schedule_revisions, sweep_expired_otps and rollover_tasks
 """
 
 import json
@@ -20,7 +22,7 @@ import boto3
 from datetime import date, timedelta, datetime
 sys.path.insert(0, "/opt/python")
 
-from shared.sqs import parse_sqs_records
+from shared.sqs import parse_sqs_records, send_message
 from shared.db import get_connection, get_cursor
 from shared.config import config
 
@@ -51,6 +53,23 @@ MISSED_REVISION_THRESHOLD = 2
 # Spaced repetition intervals
 SRS_INTERVALS = [2, 7, 15, 30]
 
+# Expired OTP sweeper: rows deleted per transaction. Same targets as the API's
+# in-app sweeper (app/services/otp_sweeper.py), which this cron replaces.
+SWEEP_BATCH_SIZE = 500
+SWEEP_TABLES = {
+    "verifications": "expires_at < %(now)s",
+    "password_reset_otps": "expires_at < %(now)s",
+    "email_change_requests": "expires_at < %(now)s",
+    # Finished emails after the retention period, and never-sent ones whose OTP expired
+    "email_outbox": """(status IN ('sent', 'failed', 'expired') AND created_at < %(outbox_cutoff)s)
+                       OR (status = 'pending' AND expires_at < %(now)s)""",
+}
+
+# Task rollover: tasks handled per transaction, and the time left (ms) at
+# which the run stops and re-enqueues itself instead of starting another batch
+ROLLOVER_BATCH_SIZE = 1000
+ROLLOVER_TIME_RESERVE_MS = 10_000
+
 
 # ─── Handler ───────────────────────────────────────────────────────────────────
 
@@ -60,7 +79,9 @@ def handler(event, context):
     # EventBridge cron trigger (no Records field)
     if "source" in event and event["source"] == "aws.events":
         result = _schedule_revisions()
-        return {"statusCode": 200, "body": json.dumps({"scheduled": result})}
+        swept = _sweep_expired_otps()
+        rolled = _rollover_tasks(context)
+        return {"statusCode": 200, "body": json.dumps({"scheduled": result, "swept": swept, "rolled": rolled})}
 
     # SQS trigger
     records = parse_sqs_records(event)
@@ -76,6 +97,10 @@ def handler(event, context):
             result = _analyze_weak_topics(payload)
         elif action == "schedule_revisions":
             result = _schedule_revisions()
+        elif action == "sweep_expired_otps":
+            result = _sweep_expired_otps()
+        elif action == "rollover_tasks":
+            result = _rollover_tasks(context, payload.get("carry_forward", config.TASK_CARRY_FORWARD))
         else:
             result = {"status": "error", "reason": f"unknown action: {action}"}
 
@@ -226,3 +251,121 @@ def _schedule_revisions() -> int:
             conn.commit()
 
     return count
+
+
+# ─── Expired OTP Sweeper ──────────────────────────────────────────────────────
+
+def _sweep_expired_otps() -> dict:
+    """Delete expired OTP rows and old outbox emails in small batches; skips rows locked by live requests."""
+    now = datetime.utcnow()
+    params = {
+        "now": now,
+        "outbox_cutoff": now - timedelta(hours=config.EMAIL_OUTBOX_RETENTION_HOURS),
+        "limit": SWEEP_BATCH_SIZE,
+    }
+    reclaimed = {}
+
+    with get_connection() as conn:
+        with get_cursor(conn) as cur:
+            for table, condition in SWEEP_TABLES.items():
+                total = 0
+                while True:
+                    cur.execute(
+                        f"""DELETE FROM {table} WHERE id IN (
+                               SELECT id FROM {table} WHERE {condition}
+                               LIMIT %(limit)s FOR UPDATE SKIP LOCKED)""",
+                        params,
+                    )
+                    deleted = cur.rowcount
+                    conn.commit()
+                    total += deleted
+                    if deleted < SWEEP_BATCH_SIZE:
+                        break
+                reclaimed[table] = total
+
+    print(f"Swept expired OTP rows: {reclaimed}")
+    return reclaimed
+
+
+# ─── Task Rollover ────────────────────────────────────────────────────────────
+
+def _rollover_tasks(context=None, carry_forward: bool = None) -> dict:
+    """Mark overdue pending tasks missed and clone them onto today, in batches.
+
+    Every batch is one statement in its own transaction, so a run that stops
+    early loses nothing; when the Lambda is close to its timeout the rest is
+    re-enqueued as another rollover_tasks message. A task is carried forward
+    at most once (clones have is_carried_forward = true and are not cloned again).
+    The same statement applies both changes to student_daily_task_stats.
+    """
+    if carry_forward is None:
+        carry_forward = config.TASK_CARRY_FORWARD
+    today = date.today()
+    missed = carried = 0
+
+    with get_connection() as conn:
+        with get_cursor(conn) as cur:
+            while True:
+                cur.execute(
+                    """WITH overdue AS (
+                           SELECT id FROM tasks
+                           WHERE status = 'pending' AND planned_date < %(today)s
+                           LIMIT %(limit)s
+                           FOR UPDATE SKIP LOCKED
+                       ), missed AS (
+                           UPDATE tasks t
+                           SET status = 'missed', updated_at = timezone('utc', now())
+                           FROM overdue
+                           WHERE t.id = overdue.id
+                           RETURNING t.*
+                       ), carried AS (
+                           INSERT INTO tasks
+                               (id, student_id, title, description, subject, topic, status, priority,
+                                planned_date, estimated_time, is_carried_forward, created_at, updated_at)
+                           SELECT gen_random_uuid(), student_id, title, description, subject, topic, 'pending', priority,
+                                  %(today)s, estimated_time, true, timezone('utc', now()), timezone('utc', now())
+                           FROM missed
+                           WHERE %(carry_forward)s AND NOT COALESCE(is_carried_forward, false)
+                           RETURNING student_id, planned_date, estimated_time
+                       ), deltas AS (
+                           -- pending -> missed on the original day, new pending tasks on today
+                           SELECT student_id, planned_date AS day, 0 AS total, -1 AS pending, 1 AS missed, 0.0 AS hours
+                           FROM missed
+                           UNION ALL
+                           SELECT student_id, planned_date, 1, 1, 0, COALESCE(estimated_time, 0)
+                           FROM carried
+                       ), stats AS (
+                           INSERT INTO student_daily_task_stats AS s
+                               (student_id, day, total, completed, pending, missed, planned_hours)
+                           SELECT student_id, day, SUM(total), 0, SUM(pending), SUM(missed), SUM(hours)
+                           FROM deltas
+                           GROUP BY student_id, day
+                           -- same lock order as the API's apply_task_stats, so the two can't deadlock
+                           ORDER BY student_id, day
+                           ON CONFLICT (student_id, day) DO UPDATE SET
+                               total = s.total + EXCLUDED.total,
+                               pending = s.pending + EXCLUDED.pending,
+                               missed = s.missed + EXCLUDED.missed,
+                               planned_hours = s.planned_hours + EXCLUDED.planned_hours
+                       )
+                       SELECT (SELECT COUNT(*) FROM missed) AS missed,
+                              (SELECT COUNT(*) FROM carried) AS carried""",
+                    {"today": today, "limit": ROLLOVER_BATCH_SIZE, "carry_forward": carry_forward},
+                )
+                row = cur.fetchone()
+                conn.commit()
+                missed += row["missed"]
+                carried += row["carried"]
+
+                if row["missed"] < ROLLOVER_BATCH_SIZE:
+                    break
+                if context is not None and context.get_remaining_time_in_millis() < ROLLOVER_TIME_RESERVE_MS:
+                    send_message(
+                        config.TASK_QUEUE_URL,
+                        {"action": "rollover_tasks", "payload": {"carry_forward": carry_forward}},
+                    )
+                    print(f"Task rollover paused after {missed} tasks; re-enqueued the rest")
+                    return {"missed": missed, "carried_forward": carried, "complete": False}
+
+    print(f"Task rollover: {missed} missed, {carried} carried forward")
+    return {"missed": missed, "carried_forward": carried, "complete": True}
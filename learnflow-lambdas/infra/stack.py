@@ -91,7 +91,7 @@ class LearnFlowLambdaStack(Stack):
             )
         )
 
-        # Daily cron for revision scheduler (6:00 AM IST = 00:30 UTC)
+        # Daily cron for revision scheduler, OTP sweep and task rollover (6:00 AM IST = 00:30 UTC)
         events.Rule(
             self, "RevisionScheduleRule",
             schedule=events.Schedule.cron(hour="0", minute="30"),
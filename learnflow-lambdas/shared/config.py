@@ -21,6 +21,12 @@ class Config:
     # Email
     MAIL_FROM: str = os.getenv("MAIL_FROM", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "ap-south-1")
+    # Sent/failed outbox emails are kept this long (same setting as the API)
+    EMAIL_OUTBOX_RETENTION_HOURS: int = int(os.getenv("EMAIL_OUTBOX_RETENTION_HOURS", "24"))
+
+    # Nightly task rollover: also clone missed tasks onto today (is_carried_forward=true).
+    # Off unless enabled; the rollover then only marks overdue tasks missed.
+    TASK_CARRY_FORWARD: bool = os.getenv("TASK_CARRY_FORWARD", "false").lower() == "true"
 
     # Supabase
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")